@@ -0,0 +1,85 @@
+# bench_detector.py
+#
+# yolo post-processing time per frame: the per-row loop of
+# vision/test_inference.py (argmax per anchor, python lists, cv2 nms)
+# against vision.detector.postprocess. the predictions are synthetic
+# (1, 84, 8400) outputs with a few objects, each seen by many anchors.
+# run from src/: python -m benchmarks.bench_detector
+
+import time
+import numpy as np
+from vision.detector import postprocess, CLASS_NAMES, CONF_THRESHOLD, NMS_THRESHOLD
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+FRAMES = 50
+ANCHORS = 8400
+
+def synthetic_predictions(objects: int, rng: np.random.Generator) -> np.ndarray:
+    classes = len(CLASS_NAMES)
+    predictions = np.empty((1, 4 + classes, ANCHORS), dtype=np.float32)
+    predictions[0, :2] = rng.uniform(0, 640, (2, ANCHORS))
+    predictions[0, 2:4] = rng.uniform(8, 200, (2, ANCHORS))
+    predictions[0, 4:] = rng.uniform(0, 0.05, (classes, ANCHORS))
+    # every object is picked up by ~40 neighbouring anchors with jittered boxes
+    for n in range(objects):
+        anchors = rng.choice(ANCHORS, 40, replace=False)
+        box = rng.uniform((50, 50, 40, 40), (590, 590, 200, 200))
+        predictions[0, :4, anchors] = box + rng.normal(0, 4, (40, 4))
+        predictions[0, 4 + rng.integers(classes), anchors] = rng.uniform(0.3, 0.9, 40)
+    return predictions
+
+def postprocess_loop(predictions: np.ndarray, x_factor: float, y_factor: float):
+    # as in vision/test_inference.py
+    if predictions.ndim == 3 and predictions.shape[1] == (len(CLASS_NAMES) + 4):
+        predictions = predictions.transpose(0, 2, 1)
+
+    boxes = []
+    confidences = []
+    class_ids = []
+
+    for detection in predictions[0]:
+        scores = detection[4:]
+        class_id = np.argmax(scores)
+        confidence = scores[class_id]
+
+        if confidence > CONF_THRESHOLD:
+            center_x = int(detection[0] * x_factor)
+            center_y = int(detection[1] * y_factor)
+            width = int(detection[2] * x_factor)
+            height = int(detection[3] * y_factor)
+
+            x = int(center_x - width / 2)
+            y = int(center_y - height / 2)
+
+            boxes.append([x, y, width, height])
+            confidences.append(float(confidence))
+            class_ids.append(class_id)
+
+    if cv2 is not None:
+        return cv2.dnn.NMSBoxes(boxes, confidences, CONF_THRESHOLD, NMS_THRESHOLD)
+    return boxes
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    rng = np.random.default_rng(0)
+    x_factor, y_factor = 1280 / 640, 720 / 640
+    if cv2 is None:
+        print("opencv not installed, the loop is timed without its nms")
+    print(f"{'objects':>8}{'loop ms':>10}{'vector ms':>11}{'speedup':>9}{'detections':>12}")
+    for objects in (0, 5, 20, 60):
+        frames = [synthetic_predictions(objects, rng) for _ in range(FRAMES)]
+        loop = np.median([timed(postprocess_loop, p, x_factor, y_factor) for p in frames]) * 1000
+        vector = np.median([timed(postprocess, p, len(CLASS_NAMES), x_factor, y_factor) for p in frames]) * 1000
+        detections = len(postprocess(frames[0], len(CLASS_NAMES), x_factor, y_factor))
+        print(f"{objects:>8}{loop:>10.2f}{vector:>11.3f}{loop / vector:>8.0f}x{detections:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# bench_indexed.py
+#
+# gpu bytes per mesh: three non-indexed vbos (position, color, normal)
+# against one interleaved position/normal vbo plus a uint32 index buffer.
+# run from src/: python -m benchmarks.bench_indexed
+
+import glob
+from digital_twin.objloader import read_obj, index_vertices
+
+def main():
+    total_before = 0
+    total_after = 0
+    print(f"{'mesh':<28}{'vertices':>10}{'unique':>10}{'before':>12}{'after':>12}{'ratio':>8}")
+    for filename in sorted(glob.glob("digital_twin/objects/*.obj")):
+        vertices, colors, normals, uvs = read_obj(filename)
+        interleaved, indices = index_vertices(vertices, normals)
+        before = vertices.nbytes + colors.nbytes + normals.nbytes
+        after = interleaved.nbytes + indices.nbytes
+        total_before += before
+        total_after += after
+        print(f"{filename.split('/')[-1]:<28}{len(vertices):>10}{len(interleaved):>10}{before:>12}{after:>12}{after / before:>8.2f}")
+    print(f"{'total':<28}{'':>10}{'':>10}{total_before:>12}{total_after:>12}{total_after / total_before:>8.2f}")
+
+if __name__ == "__main__":
+    main()
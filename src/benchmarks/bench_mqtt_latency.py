@@ -0,0 +1,100 @@
+# bench_mqtt_latency.py
+#
+# end-to-end latency of MQTTHandler: publish -> on_message -> batched gui
+# drain -> VehicleState update, and the highest message rate it sustains.
+# every topic is published at the given rate. without --host the messages
+# are handed to on_message from a thread, standing in for the paho loop.
+# needs wx. run from src/:
+#   python -m benchmarks.bench_mqtt_latency [--host 127.0.0.1] [--format binary]
+
+import time
+import argparse
+import threading
+import types
+import numpy as np
+import wx
+from digital_twin.vehiclestate import VehicleState
+from messagelog import MessageLog
+from mqtt.mqtt_handler import MQTTHandler
+from mqtt.loadgen import LoadGenerator
+
+DURATION = 3.0
+# time left after the last message for the queue to drain
+SETTLE = 1.0
+RATES = (50, 200, 1000, 5000, 20000)
+# a rate is sustained if nearly everything arrives within this p99
+MAX_P99 = 0.1
+
+def run(app: wx.App, rate: float, payload_format: str, host: str):
+    vehicle_state = VehicleState(max_points=1 << 18)
+    frame = wx.Frame(None)
+    handler = MQTTHandler(MessageLog(frame), vehicle_state)
+
+    if host:
+        import paho.mqtt.client as mqtt
+        handler.SetBrokerAddress(host)
+        handler.connect()
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        client.connect(host, 1883, 60)
+        client.loop_start()
+        publish = lambda topic, payload: client.publish(topic, payload)
+    else:
+        publish = lambda topic, payload: handler.on_message(None, None, types.SimpleNamespace(topic=topic, payload=payload))
+
+    generator = LoadGenerator(publish, rate, payload_format=payload_format, tag_sequence=True)
+    latencies = []
+    read = [0]
+
+    def on_update():
+        # VehicleState listener, runs right after the batch is applied
+        now = time.perf_counter()
+        first, points = vehicle_state.positions_since(read[0])
+        read[0] = first + len(points)
+        send_times = generator.send_times
+        latencies.extend(now - send_times[sequence] for sequence in points[:, 0].astype(np.int64).tolist())
+
+    vehicle_state.add_listener(on_update)
+
+    def produce():
+        if host:
+            # give the subscription time to settle
+            time.sleep(1.0)
+        generator.run(DURATION)
+        time.sleep(SETTLE)
+        wx.CallAfter(finish)
+
+    def finish():
+        if host:
+            client.loop_stop()
+            client.disconnect()
+            handler.disconnect()
+        frame.Close()
+
+    threading.Thread(target=produce, daemon=True).start()
+    app.MainLoop()
+    return generator.sequence, np.array(latencies), handler.queue.dropped
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="", help="broker address, in-process when empty")
+    parser.add_argument("--format", choices=("text", "binary"), default="text")
+    args = parser.parse_args()
+
+    app = wx.App()
+    print(f"{'rate/topic':>10}{'sent':>9}{'recv %':>8}{'dropped':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    sustained = 0
+    for rate in RATES:
+        sent, latencies, dropped = run(app, rate, args.format, args.host)
+        received = 100.0 * len(latencies) / max(sent, 1)
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, (50, 90, 99)) * 1000
+            worst = latencies.max() * 1000
+        else:
+            p50 = p90 = p99 = worst = float("nan")
+        print(f"{rate:>10}{sent:>9}{received:>8.1f}{dropped:>9}{p50:>9.2f}{p90:>9.2f}{p99:>9.2f}{worst:>9.2f}")
+        if received >= 99.0 and p99 < MAX_P99 * 1000:
+            sustained = rate
+    print(f"max sustained rate: {sustained} msg/s per topic ({args.format}, {args.host or 'in-process'})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench_objloader.py
+#
+# compares the vectorized obj loader against the original per-face loader.
+# run from src/: python -m benchmarks.bench_objloader
+
+import glob
+import time
+import numpy as np
+from digital_twin.objloader import read_obj
+
+def read_obj_reference(filename, color=[1, 1, 1]):
+    # original line-by-line loader, kept here as the reference implementation
+    vertices = []
+    faces = []
+    normals_loaded = []
+    uvs = []
+
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            line_elements = line.split(' ')
+
+            if line_elements[0] == "v":
+                vertices.append([float(line_elements[1]), float(line_elements[2]), float(line_elements[3])])
+            elif line_elements[0] == "f":
+                face = []
+                for i in range(1, len(line_elements)):
+                    vertex_data = line_elements[i].split('/')
+                    face.append([int(v)-1 if v else None for v in vertex_data])
+                faces.append(face)
+            elif line_elements[0] == "vn":
+                normals_loaded.append([float(line_elements[1]), float(line_elements[2]), float(line_elements[3])])
+            elif line_elements[0] == "vt":
+                uvs.append([float(line_elements[1]), float(line_elements[2])])
+
+    positions_new = []
+    normals_new = []
+    uvs_new = []
+
+    for face in faces:
+        vertex1 = np.array(vertices[face[0][0]])
+        vertex2 = np.array(vertices[face[1][0]])
+        vertex3 = np.array(vertices[face[2][0]])
+
+        edge1 = vertex2 - vertex1
+        edge2 = vertex3 - vertex1
+        face_normal = np.cross(edge1, edge2)
+        face_normal = face_normal / np.linalg.norm(face_normal) if np.linalg.norm(face_normal) > 0 else np.array([0.0, 1.0, 0.0])
+
+        for vert in face:
+            positions_new.append(vertices[vert[0]])
+
+            if len(vert) > 1 and vert[1] is not None:
+                uvs_new.append(uvs[vert[1]])
+            else:
+                uvs_new.append([0.0, 0.0])
+
+            if len(vert) > 2 and vert[2] is not None and normals_loaded:
+                normals_new.append(normals_loaded[vert[2]])
+            else:
+                normals_new.append(face_normal.tolist())
+
+    colors = [color for _ in range(len(positions_new))]
+
+    return np.array(positions_new, dtype=np.float32), np.array(colors, dtype=np.float32), np.array(normals_new, dtype=np.float32), np.array(uvs_new, dtype=np.float32)
+
+def best_of(function, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    total_reference = 0.0
+    total_vectorized = 0.0
+    print(f"{'mesh':<28}{'reference':>12}{'vectorized':>12}{'speedup':>10}")
+    for filename in sorted(glob.glob("digital_twin/objects/*.obj")):
+        color = [0.7, 0.7, 0.7]
+        t_reference, expected = best_of(read_obj_reference, filename, color)
+        t_vectorized, result = best_of(read_obj, filename, color)
+        for name, a, b in zip(("vertices", "colors", "normals", "uvs"), expected, result):
+            assert a.dtype == b.dtype and a.shape == b.shape, f"{filename}: {name} shape mismatch"
+            assert np.allclose(a, b, atol=1e-6), f"{filename}: {name} mismatch"
+        total_reference += t_reference
+        total_vectorized += t_vectorized
+        print(f"{filename.split('/')[-1]:<28}{t_reference * 1000:>10.1f}ms{t_vectorized * 1000:>10.1f}ms{t_reference / t_vectorized:>9.1f}x")
+    print(f"{'total':<28}{total_reference * 1000:>10.1f}ms{total_vectorized * 1000:>10.1f}ms{total_reference / total_vectorized:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_offscreen.py
+#
+# frame time of the digital twin scene without a window: cpu time per frame
+# and per scene pass, frame time including glFinish, and gl calls per pass.
+# the arm is animated and the vehicle gets telemetry every frame. --distance
+# moves the camera away from the rover, --no-cull turns off frustum culling
+# and level of detail. needs egl or osmesa (software gl is fine). run from src/:
+#   python -m benchmarks.bench_offscreen [--platform osmesa] [--frames 500] [--distance 5000] [--json results.json]
+
+import os
+import time
+import json
+import argparse
+import glm
+import numpy as np
+from math import sin, cos
+from digital_twin.vehiclestate import VehicleState
+
+WARMUP = 20
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--points", type=int, default=10, help="telemetry positions per frame")
+    parser.add_argument("--distance", type=float, default=700.0, help="camera distance from the rover")
+    parser.add_argument("--no-cull", action="store_true", help="draw everything at full detail")
+    parser.add_argument("--json", default="", help="also write the results to this file")
+    parser.add_argument("--platform", choices=("egl", "osmesa"), default="egl", help="used when PYOPENGL_PLATFORM isn't set")
+    args = parser.parse_args()
+
+    # pyopengl picks its platform on first import
+    os.environ.setdefault("PYOPENGL_PLATFORM", args.platform)
+    from OpenGL.GL import glFinish
+    from digital_twin.offscreen import OffscreenRenderer
+
+    vehicle_state = VehicleState(max_points=20000, levels=6)
+    renderer = OffscreenRenderer(vehicle_state, args.width, args.height)
+    scene = renderer.scene
+    scene.vehicle_arm.animate = True
+    scene.camera.frustum.enabled = not args.no_cull
+    scene.camera.position = glm.vec3(0.0, 0.43 * args.distance, args.distance)
+    scene.camera.front = glm.normalize(glm.vec3(0.0, 50.0, 0.0) - scene.camera.position)
+
+    submit_times = []
+    frame_times = []
+    pass_times = {}
+    t = 0.0
+    for frame in range(WARMUP + args.frames):
+        # circle with the telemetry, like a live run would
+        points = []
+        for i in range(args.points):
+            t += 0.001
+            points.append((200 * cos(t), 0.0, 200 * sin(t)))
+        vehicle_state.add_positions(points)
+
+        measuring = frame >= WARMUP
+        start = time.perf_counter()
+        renderer.render(pass_times if measuring else None)
+        submitted = time.perf_counter()
+        glFinish()
+        finished = time.perf_counter()
+        if measuring:
+            submit_times.append(submitted - start)
+            frame_times.append(finished - start)
+
+    calls = renderer.count_calls()
+    renderer.release()
+
+    submit_times = np.array(submit_times) * 1000
+    frame_times = np.array(frame_times) * 1000
+    print(f"{args.frames} frames at {args.width}x{args.height}, camera at {args.distance:g}, culling {'off' if args.no_cull else 'on'}")
+    print(f"{'':<10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, times in (("cpu", submit_times), ("frame", frame_times)):
+        print(f"{label:<10}{times.mean():>10.3f}{np.percentile(times, 50):>10.3f}{np.percentile(times, 99):>10.3f}")
+    print()
+    print(f"{'pass':<16}{'cpu ms':>10}{'gl calls':>10}  top calls")
+    for name, total in pass_times.items():
+        counts = calls.get(name, {})
+        top = ", ".join(f"{function} {n}" for function, n in sorted(counts.items(), key=lambda item: -item[1])[:3])
+        print(f"{name:<16}{total * 1000 / args.frames:>10.3f}{sum(counts.values()):>10}  {top}")
+    print(f"{'total':<16}{sum(pass_times.values()) * 1000 / args.frames:>10.3f}{sum(sum(c.values()) for c in calls.values()):>10}")
+
+    if args.json:
+        results = {
+            "frames": args.frames,
+            "width": args.width,
+            "height": args.height,
+            "distance": args.distance,
+            "culling": not args.no_cull,
+            "cpu_ms": {"mean": submit_times.mean(), "p50": np.percentile(submit_times, 50), "p99": np.percentile(submit_times, 99)},
+            "frame_ms": {"mean": frame_times.mean(), "p50": np.percentile(frame_times, 50), "p99": np.percentile(frame_times, 99)},
+            "passes": {name: {"cpu_ms": total * 1000 / args.frames, "gl_calls": calls.get(name, {})} for name, total in pass_times.items()},
+        }
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=float)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# bench_preprocess.py
+#
+# yolo input preprocessing per frame: the resize, cvtColor, astype / 255,
+# transpose, expand_dims chain of vision/test_inference.py against
+# vision.detector.Preprocessor, which letterboxes into one reused input
+# tensor. reports the median time and the peak memory numpy allocates per
+# frame (tracemalloc, opencv's own allocations are not seen).
+# run from src/: python -m benchmarks.bench_preprocess
+
+import time
+import tracemalloc
+import numpy as np
+from vision.detector import Preprocessor, INPUT_WIDTH, INPUT_HEIGHT
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+FRAMES = 200
+FRAME_SIZES = ((1280, 720), (640, 480), (640, 640))
+
+def preprocess_chain(frame: np.ndarray) -> np.ndarray:
+    # as in vision/test_inference.py
+    resized_frame = cv2.resize(frame, (INPUT_WIDTH, INPUT_HEIGHT))
+    rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
+    input_tensor = rgb_frame.astype(np.float32) / 255.0
+    input_tensor = np.transpose(input_tensor, (2, 0, 1))
+    input_tensor = np.expand_dims(input_tensor, axis=0)
+    return input_tensor
+
+def measure(function, frames: list) -> tuple:
+    # (median ms, peak numpy bytes of one call after warming up)
+    function(frames[0])
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        function(frame)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(frames[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return np.median(times) * 1000, peak
+
+def main():
+    if cv2 is None:
+        print("opencv is needed for this benchmark")
+        return
+    rng = np.random.default_rng(0)
+    print(f"{'frame':>10}{'chain ms':>10}{'chain MB':>10}{'buffer ms':>11}{'buffer MB':>11}")
+    for width, height in FRAME_SIZES:
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+        frames = [frames[n % len(frames)] for n in range(FRAMES)]
+        chain_ms, chain_peak = measure(preprocess_chain, frames)
+        buffer_ms, buffer_peak = measure(Preprocessor(), frames)
+        print(f"{width:>5}x{height:<4}{chain_ms:>10.2f}{chain_peak / 2**20:>10.2f}{buffer_ms:>11.2f}{buffer_peak / 2**20:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_render_scheduler.py
+#
+# cpu usage of the digital twin view with the old free-running 5 ms timer
+# against demand-driven rendering, idle and with synthetic telemetry.
+# needs a display and opengl. run from src/: python -m benchmarks.bench_render_scheduler
+
+import time
+import threading
+import wx
+from digital_twin.view import PanelView
+from digital_twin.vehiclestate import VehicleState
+
+DURATION = 10.0
+
+def telemetry(vehicle_state: VehicleState, rate_hz: float, stop: threading.Event):
+    i = 0
+    while not stop.wait(1.0 / rate_hz):
+        vehicle_state.add_position([i * 0.5, 0.0, 0.0])
+        i += 1
+
+def run(app: wx.App, mode: str, rate_hz: float):
+    vehicle_state = VehicleState()
+    frame = wx.Frame(None, size=wx.Size(800, 600))
+    view = PanelView(frame, vehicle_state)
+    frame.Show()
+
+    if mode == "timer":
+        # the previous behaviour: repaint every 5 ms no matter what
+        timer = wx.Timer()
+        timer.Bind(wx.EVT_TIMER, lambda event: view.Refresh(False))
+        timer.Start(5)
+
+    def start():
+        if mode != "timer":
+            view.scene.vehicle_arm.animate = False
+        result["frames"] = view.render_scheduler.frame_count
+        result["cpu"] = time.process_time()
+        result["wall"] = time.perf_counter()
+        if rate_hz > 0:
+            threading.Thread(target=telemetry, args=(vehicle_state, rate_hz, stop), daemon=True).start()
+
+    def finish():
+        stop.set()
+        result["frames"] = view.render_scheduler.frame_count - result["frames"]
+        result["cpu"] = time.process_time() - result["cpu"]
+        result["wall"] = time.perf_counter() - result["wall"]
+        if mode == "timer":
+            timer.Stop()
+        frame.Close()
+
+    result = {}
+    stop = threading.Event()
+    # give the first paint (gl init, mesh upload) time to finish before measuring
+    wx.CallLater(1000, start)
+    wx.CallLater(int((1.0 + DURATION) * 1000), finish)
+    app.MainLoop()
+    return result
+
+def main():
+    app = wx.App()
+    print(f"{'mode':<10}{'telemetry':>12}{'frames/s':>10}{'cpu %':>8}")
+    for mode, rate_hz in (("timer", 0), ("demand", 0), ("timer", 10), ("demand", 10), ("demand", 200)):
+        result = run(app, mode, rate_hz)
+        fps = result["frames"] / result["wall"]
+        cpu = 100.0 * result["cpu"] / result["wall"]
+        print(f"{mode:<10}{rate_hz:>10}Hz{fps:>10.1f}{cpu:>8.1f}")
+
+if __name__ == "__main__":
+    main()
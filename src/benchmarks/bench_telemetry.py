@@ -0,0 +1,47 @@
+# bench_telemetry.py
+#
+# decode throughput of the text and the packed binary telemetry formats.
+# run from src/: python -m benchmarks.bench_telemetry [messages]
+
+import sys
+import time
+import numpy as np
+from mqtt.telemetryformat import TOPIC_FORMATS, encode, parse_message, decode_binary, decode_batch, record_values
+
+def make_payloads(topic, n):
+    rng = np.random.default_rng(0)
+    kind, dtype, fields = TOPIC_FORMATS[topic]
+    width = sum(dtype[field].shape[0] for field in fields)
+    values = rng.uniform(-100, 100, (n, width)).astype(np.float32)
+    text = [" ".join(f"{v:.4f}" for v in row).encode() for row in values]
+    binary = [encode(topic, row, i, time.time()) for i, row in enumerate(values)]
+    return text, binary
+
+def timed(function, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for topic in ("rocky/position", "rocky/imu"):
+        text, binary = make_payloads(topic, n)
+
+        # values only: split + float per message against one frombuffer
+        t_text = timed(lambda: [tuple(float(v) for v in p.decode().split()) for p in text])
+        t_binary = timed(lambda: record_values(topic, decode_batch(topic, binary)[0]))
+
+        # full path: parse on the network thread, then the batched gui decode
+        t_text_full = timed(lambda: decode_binary([parse_message(topic, p) for p in text]))
+        t_binary_full = timed(lambda: decode_binary([parse_message(topic, p) for p in binary]))
+
+        print(f"{topic} ({n} messages)")
+        print(f"  wire size    text {sum(map(len, text)) / n:6.1f} B/msg   binary {len(binary[0]):6.1f} B/msg (with sequence and timestamp)")
+        print(f"  values only  text {n / t_text / 1e3:8.0f} k msg/s   binary {n / t_binary / 1e3:8.0f} k msg/s   {t_text / t_binary:5.1f}x")
+        print(f"  full path    text {n / t_text_full / 1e3:8.0f} k msg/s   binary {n / t_binary_full / 1e3:8.0f} k msg/s   {t_text_full / t_binary_full:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_wireframe.py
+#
+# cpu and gpu time of the vehicle base and the arm with the two-pass
+# wireframe (line pass + solid pass), the single-pass edge overlay and no
+# wireframe at all. gpu time comes from GL_TIME_ELAPSED queries around the
+# two draws. needs a display and opengl. run from src/: python -m benchmarks.bench_wireframe
+
+import time
+import numpy as np
+import wx
+from OpenGL.GL import *
+from digital_twin.view import PanelView
+from digital_twin.vehiclestate import VehicleState
+
+FRAMES = 300
+MODES = ("two_pass", "overlay", "off")
+
+def run(app: wx.App, mode: str):
+    frame = wx.Frame(None, size=wx.Size(1280, 720))
+    view = PanelView(frame, VehicleState())
+    frame.Show()
+
+    cpu_times = []
+    gpu_times = []
+    state = {"query": None, "measuring": False}
+
+    def timed(draw, first):
+        # the base is drawn first, it opens the sample of the frame
+        def wrapper(*args):
+            if not state["measuring"]:
+                return draw(*args)
+            if first:
+                if len(cpu_times) >= FRAMES:
+                    state["measuring"] = False
+                    view.scene.vehicle_arm.animate = False
+                    wx.CallAfter(frame.Close)
+                    return draw(*args)
+                cpu_times.append(0.0)
+                gpu_times.append(0.0)
+            glBeginQuery(GL_TIME_ELAPSED, state["query"])
+            start = time.perf_counter()
+            draw(*args)
+            cpu_times[-1] += time.perf_counter() - start
+            glEndQuery(GL_TIME_ELAPSED)
+            gpu_times[-1] += glGetQueryObjectui64v(state["query"], GL_QUERY_RESULT) * 1e-9
+        return wrapper
+
+    def start():
+        view.SetCurrent(view.context)
+        state["query"] = glGenQueries(1)
+        view.scene.vehicle_base.wireframe = mode
+        view.scene.vehicle_arm.wireframe = mode
+        view.scene.vehicle_base.draw_object = timed(view.scene.vehicle_base.draw_object, True)
+        view.scene.vehicle_arm.draw_object = timed(view.scene.vehicle_arm.draw_object, False)
+        # animated joints keep the view repainting every frame
+        view.scene.vehicle_arm.animate = True
+        state["measuring"] = True
+        view.Refresh(False)
+
+    # give the first paint (gl init, mesh upload) time to finish before measuring
+    wx.CallLater(1000, start)
+    app.MainLoop()
+    # drop the first frames of every mode: the driver's lazy state setup for
+    # the new polygon mode and the first timer query results land there
+    return np.array(cpu_times[10:]), np.array(gpu_times[10:])
+
+def main():
+    app = wx.App()
+    print(f"{'mode':<10}{'cpu ms':>10}{'cpu p99':>10}{'gpu ms':>10}{'gpu p99':>10}")
+    for mode in MODES:
+        cpu, gpu = run(app, mode)
+        cpu, gpu = cpu * 1000, gpu * 1000
+        print(f"{mode:<10}{np.median(cpu):>10.3f}{np.percentile(cpu, 99):>10.3f}{np.median(gpu):>10.3f}{np.percentile(gpu, 99):>10.3f}")
+
+if __name__ == "__main__":
+    main()
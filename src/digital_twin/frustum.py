@@ -0,0 +1,65 @@
+# frustum.py
+
+import glm
+import numpy as np
+
+# projected diameter in pixels at which every level of detail stops being
+# used: level 0 down to LOD_PIXELS[0], level 1 down to LOD_PIXELS[1], ...
+LOD_PIXELS = (240.0, 90.0, 30.0)
+
+def transform_spheres(models: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> tuple:
+    # world space bounding spheres of object spheres under (..., 4, 4)
+    # row-major models. the radius grows with the largest axis scale
+    world_centers = np.einsum("...ij,...j->...i", models[..., :3, :3], centers) + models[..., :3, 3]
+    scale = np.linalg.norm(models[..., :3, :3], axis=-2).max(axis=-1)
+    return world_centers, radii * scale
+
+class Frustum:
+    # the camera's view frustum of the current frame, for culling on the cpu
+    # and picking a level of detail from the projected size. when disabled
+    # everything is visible and drawn at full detail
+    def __init__(self):
+        self.enabled = True
+        self.planes = np.zeros((6, 4))
+        self.planes[:, 3] = 1.0
+        self.position = np.zeros(3)
+        # pixels per unit of radius / distance
+        self.pixel_scale = 1.0
+        # objects smaller than this on screen are not drawn at all
+        self.min_pixels = 1.0
+
+    def update(self, projection: glm.mat4, view: glm.mat4, viewport_height: int, position: glm.vec3) -> None:
+        # planes from the rows of the view-projection matrix (gribb, hartmann),
+        # as (a, b, c, d) with a*x + b*y + c*z + d >= 0 inside
+        m = np.array((projection * view).to_list(), dtype=np.float64).T
+        planes = np.array((m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]))
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.position = np.array(position.to_list(), dtype=np.float64)
+        self.pixel_scale = projection[1][1] * viewport_height
+
+    def visible_spheres(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        # (...) bool for (..., 3) centers and (...) radii
+        if not self.enabled:
+            return np.ones(np.shape(radii), dtype=bool)
+        distances = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        visible = np.all(distances >= -np.asarray(radii)[..., None], axis=-1)
+        return visible & (self.pixel_sizes(centers, radii) >= self.min_pixels)
+
+    def visible(self, center: np.ndarray, radius: float) -> bool:
+        return bool(self.visible_spheres(np.asarray(center, dtype=np.float64), radius))
+
+    def pixel_sizes(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        # projected diameter in pixels, huge when the camera is inside
+        radii = np.asarray(radii, dtype=np.float64)
+        distances = np.linalg.norm(centers - self.position, axis=-1)
+        return self.pixel_scale * radii / np.maximum(distances - radii, 1e-6)
+
+    def select_lods(self, centers: np.ndarray, radii: np.ndarray, lod_count: int) -> np.ndarray:
+        if not self.enabled:
+            return np.zeros(np.shape(radii), dtype=np.int64)
+        pixels = self.pixel_sizes(centers, radii)
+        levels = np.sum(pixels[..., None] < np.array(LOD_PIXELS), axis=-1)
+        return np.minimum(levels, lod_count - 1)
+
+    def select_lod(self, center: np.ndarray, radius: float, lod_count: int) -> int:
+        return int(self.select_lods(np.asarray(center, dtype=np.float64), radius, lod_count))
@@ -0,0 +1,132 @@
+# kinematics.py
+
+import numpy as np
+from math import pi
+
+# 4x4 float64 matrices, row-major, column vectors (same convention as glm:
+# parent @ local). rotations are right-handed about a unit axis
+
+def translation(v) -> np.ndarray:
+    m = np.eye(4)
+    m[:3, 3] = v
+    return m
+
+def rotation(angle: float, axis) -> np.ndarray:
+    return rotations(np.array([angle]), axis)[0]
+
+def rotations(angles: np.ndarray, axis) -> np.ndarray:
+    # one rotation matrix per angle, (n, 4, 4)
+    x, y, z = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    c = np.cos(angles)
+    s = np.sin(angles)
+    t = 1.0 - c
+    m = np.zeros((len(angles), 4, 4))
+    m[:, 0, 0] = t * x * x + c
+    m[:, 0, 1] = t * x * y - s * z
+    m[:, 0, 2] = t * x * z + s * y
+    m[:, 1, 0] = t * x * y + s * z
+    m[:, 1, 1] = t * y * y + c
+    m[:, 1, 2] = t * y * z - s * x
+    m[:, 2, 0] = t * x * z - s * y
+    m[:, 2, 1] = t * y * z + s * x
+    m[:, 2, 2] = t * z * z + c
+    m[:, 3, 3] = 1.0
+    return m
+
+def compose(*ops) -> np.ndarray:
+    # ("t", (x, y, z)) and ("r", angle, (x, y, z)) applied left to right,
+    # like a chain of glm.translate / glm.rotate calls
+    m = np.eye(4)
+    for op in ops:
+        if op[0] == "t":
+            m = m @ translation(op[1])
+        else:
+            m = m @ rotation(op[1], op[2])
+    return m
+
+class KinematicLink:
+    # parent is the index of the parent link (-1 for the root, attached to
+    # the base transform). local transform = offset @ rotation(joint angle)
+    def __init__(self, name: str, mesh: str, parent: int, offset: np.ndarray, joint: int = None, axis=(0.0, 1.0, 0.0)):
+        self.name = name
+        self.mesh = mesh
+        self.parent = parent
+        self.offset = offset
+        self.joint = joint
+        self.axis = axis
+
+class KinematicTree:
+    # links must be ordered parents first. the transforms relative to the
+    # base are cached and only recomputed when a joint angle changes
+    def __init__(self, links: list, joint_count: int):
+        self.links = links
+        self.joint_count = joint_count
+        self.joint_angles = np.zeros(joint_count)
+        self.relative = None
+        # bumped every time the cached transforms change
+        self.revision = 0
+
+    def set_joint_angles(self, joint_angles) -> bool:
+        joint_angles = np.asarray(joint_angles, dtype=np.float64)[:self.joint_count]
+        if np.array_equal(joint_angles, self.joint_angles[:len(joint_angles)]):
+            return False
+        self.joint_angles[:len(joint_angles)] = joint_angles
+        self.relative = None
+        return True
+
+    def relative_transforms(self) -> np.ndarray:
+        # (links, 4, 4), link transforms relative to the base
+        if self.relative is None:
+            self.relative = self.forward_batch(self.joint_angles[None])[0]
+            self.revision += 1
+        return self.relative
+
+    def world_transforms(self, base: np.ndarray) -> np.ndarray:
+        return base @ self.relative_transforms()
+
+    def forward_batch(self, joint_angles: np.ndarray) -> np.ndarray:
+        # forward kinematics of many poses at once: (poses, joints) angles to
+        # (poses, links, 4, 4) transforms relative to the base
+        joint_angles = np.atleast_2d(np.asarray(joint_angles, dtype=np.float64))
+        poses = len(joint_angles)
+        transforms = np.empty((poses, len(self.links), 4, 4))
+        for i, link in enumerate(self.links):
+            local = link.offset
+            if link.joint is not None:
+                local = local @ rotations(joint_angles[:, link.joint], link.axis)
+            if link.parent < 0:
+                transforms[:, i] = local
+            else:
+                transforms[:, i] = transforms[:, link.parent] @ local
+        return transforms
+
+    def end_effector_positions(self, joint_angles: np.ndarray) -> np.ndarray:
+        # origin of the last link for every pose, (poses, 3), for previews
+        return self.forward_batch(joint_angles)[:, -1, :3, 3]
+
+# ------------------------------------------------------------
+# rocky's arm
+# ------------------------------------------------------------
+
+ARM_MESH_DIRECTORY = "digital_twin/objects/"
+Y = (0.0, 1.0, 0.0)
+
+def _link(name, mesh, parent, *ops, joint=None):
+    return KinematicLink(name, ARM_MESH_DIRECTORY + mesh, parent, compose(*ops), joint, Y)
+
+# relative to VehicleBase.model, joint 0 and 1 are the shoulder servos and
+# joint 2 the elbow, all about the adapter's y axis
+ARM_LINKS = [
+    _link("support_1", "servo_support.obj", -1, ("t", (0.0, 85.0, 80.0)), ("r", pi, (1.0, 0.0, 0.0)), ("r", pi, (0.0, 1.0, 0.0))),
+    _link("motor_1", "servo_motor.obj", 0, ("r", pi, (1.0, 0.0, 0.0)), ("t", (10.3, 24, 11.4))),
+    _link("adapter_1", "servo_adapter.obj", 1, joint=0),
+    _link("support_2", "servo_support.obj", 2, ("r", pi/2, (1.0, 0.0, 0.0)), ("r", -pi/2, (0.0, 0.0, 1.0)), ("t", (0.0, 0.0, -8.5))),
+    _link("motor_2", "servo_motor.obj", 3, ("r", pi, (1.0, 0.0, 0.0)), ("t", (10.3, 24, 11.4))),
+    _link("adapter_2", "servo_adapter.obj", 4, joint=1),
+    _link("arm", "arm.obj", 5, ("r", pi/2, (1.0, 0.0, 0.0)), ("r", pi/2, (0.0, 1.0, 0.0)), ("t", (-19.3, 0.0, 0.0))),
+    _link("adapter_3", "servo_adapter.obj", 6, ("r", pi/2, (0.0, 0.0, 1.0)), ("t", (180.0, 19.3, 0.0)), joint=2),
+    _link("motor_3", "servo_motor.obj", 7, ("r", pi, (0.0, 1.0, 0.0))),
+    _link("support_3", "servo_support.obj", 8, ("r", -pi, (0.0, 0.0, 1.0)), ("t", (10.3, 24, 11.4))),
+    _link("gripper_union", "arm_gripper_union.obj", 9, ("r", -pi/2, (0.0, 0.0, 1.0)), ("t", (4.4, 10.0, 2.0))),
+]
+ARM_JOINT_COUNT = 3
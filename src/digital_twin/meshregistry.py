@@ -0,0 +1,173 @@
+# meshregistry.py
+
+import os
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from digital_twin.objloader import load_lods
+
+# interleaved vertex layout: vec3 position, vec3 normal
+VERTEX_STRIDE = 6 * 4
+
+class Mesh:
+    # lods: [(first index, index count)] of every level of detail, all of
+    # them live in the same buffers. vertex_count and index_count are level 0
+    def __init__(self, key, vao, buffers, vertex_count, index_count, nbytes, lods=None, bounds=None):
+        self.key = key
+        self.vao = vao
+        self.buffers = buffers
+        self.vertex_count = vertex_count
+        self.index_count = index_count
+        self.nbytes = nbytes
+        # size of the old layout: three non-indexed vec3 vbos (position, color, normal)
+        self.expanded_nbytes = index_count * 3 * 3 * 4
+        self.ref_count = 0
+        self.lods = lods or [(0, index_count)]
+        # object space axis aligned box, and the sphere around its center
+        # that holds every vertex: (min, max, radius)
+        self.bounds_min, self.bounds_max, self.radius = bounds if bounds is not None else (np.zeros(3), np.zeros(3), 0.0)
+        self.center = (self.bounds_min + self.bounds_max) / 2
+
+    def draw(self, mode=GL_TRIANGLES, lod: int = 0) -> None:
+        first, count = self.lods[lod]
+        glBindVertexArray(self.vao)
+        glDrawElements(mode, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+
+def mesh_bounds(interleaved: np.ndarray) -> tuple:
+    # (min, max, radius) of the positions, the sphere is centered on the box.
+    # every lod stays inside the level 0 box, vertex clustering only averages
+    positions = np.asarray(interleaved[:, :3], dtype=np.float64)
+    lo = positions.min(axis=0)
+    hi = positions.max(axis=0)
+    radius = float(np.linalg.norm(positions - (lo + hi) / 2, axis=1).max())
+    return lo, hi, radius
+
+# per-instance mat4 at attribute locations 3..6, one column each
+INSTANCE_MODEL_LOCATION = 3
+
+class InstanceBatch:
+    # draws one mesh many times in a single call, with a model matrix per
+    # instance. it has its own vao over the mesh buffers so the shared mesh
+    # vao is left untouched
+    def __init__(self, mesh: Mesh):
+        self.mesh = mesh
+        self.instance_count = 0
+        self.capacity = 0
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        vbo, ebo = mesh.buffers
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glVertexAttribPointer(0, 3, GL_FLOAT, False, VERTEX_STRIDE, ctypes.c_void_p(0)) # position
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(2, 3, GL_FLOAT, False, VERTEX_STRIDE, ctypes.c_void_p(3 * 4)) # normal
+        glEnableVertexAttribArray(2)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+
+        self.instance_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        for column in range(4):
+            location = INSTANCE_MODEL_LOCATION + column
+            glVertexAttribPointer(location, 4, GL_FLOAT, False, 16 * 4, ctypes.c_void_p(column * 4 * 4))
+            glEnableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 1)
+
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def update(self, models: np.ndarray) -> None:
+        # models: (n, 4, 4) row-major matrices, uploaded column-major
+        data = np.ascontiguousarray(np.transpose(models, (0, 2, 1)), dtype=np.float32)
+        self.instance_count = len(data)
+        if len(data) == 0:
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        if len(data) > self.capacity:
+            self.capacity = len(data)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+        else:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, mode=GL_TRIANGLES, lod: int = 0) -> None:
+        if self.instance_count == 0:
+            return
+        first, count = self.mesh.lods[lod]
+        glBindVertexArray(self.vao)
+        glDrawElementsInstanced(mode, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4), self.instance_count)
+
+    def delete(self) -> None:
+        glDeleteBuffers(1, [self.instance_vbo])
+        glDeleteVertexArrays(1, [self.vao])
+
+class MeshRegistry:
+    # owns the gl buffers of every obj mesh, each path is uploaded once and
+    # the same vao is handed out to every user. color is a shader uniform so
+    # it is not part of the mesh
+    def __init__(self):
+        self.meshes = {}
+
+    def acquire(self, filename: str) -> Mesh:
+        key = os.path.normpath(filename)
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = self.upload(key, load_lods(filename))
+            self.meshes[key] = mesh
+        mesh.ref_count += 1
+        return mesh
+
+    def release(self, mesh: Mesh) -> None:
+        mesh.ref_count -= 1
+        if mesh.ref_count > 0:
+            return
+        glDeleteBuffers(len(mesh.buffers), mesh.buffers)
+        glDeleteVertexArrays(1, [mesh.vao])
+        del self.meshes[mesh.key]
+
+    def upload(self, key, lods: list) -> Mesh:
+        # every level goes into one vbo/ebo, the indices of a level are
+        # offset by the vertices of the levels before it
+        offsets = np.cumsum([0] + [len(interleaved) for interleaved, indices in lods[:-1]])
+        interleaved = np.concatenate([lod[0] for lod in lods])
+        indices = np.concatenate([np.asarray(lod[1]) + np.uint32(offset) for lod, offset in zip(lods, offsets)])
+        counts = [len(lod[1]) for lod in lods]
+        firsts = np.cumsum([0] + counts[:-1])
+        lod_ranges = [(int(first), count) for first, count in zip(firsts, counts)]
+
+        # ----------------- vao ----------------- #
+        vao = glGenVertexArrays(1)
+        glBindVertexArray(vao)
+        # ------------ position/normal ------------ #
+        vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferData(GL_ARRAY_BUFFER, interleaved.nbytes, np.ascontiguousarray(interleaved), GL_STATIC_DRAW)
+        glVertexAttribPointer(0, 3, GL_FLOAT, False, VERTEX_STRIDE, ctypes.c_void_p(0)) # position
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(2, 3, GL_FLOAT, False, VERTEX_STRIDE, ctypes.c_void_p(3 * 4)) # normal
+        glEnableVertexAttribArray(2)
+        # ---------------- indices ---------------- #
+        ebo = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, np.ascontiguousarray(indices), GL_STATIC_DRAW)
+
+        # unbind the vao first, the element buffer binding is part of its state
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        nbytes = interleaved.nbytes + indices.nbytes
+        return Mesh(key, vao, [vbo, ebo], len(lods[0][0]), counts[0], nbytes, lod_ranges, mesh_bounds(lods[0][0]))
+
+    def bytes_resident(self) -> int:
+        return sum(mesh.nbytes for mesh in self.meshes.values())
+
+    def dump(self) -> str:
+        lines = []
+        for filename, mesh in self.meshes.items():
+            lines.append(f"{os.path.basename(filename)} vao={mesh.vao} refs={mesh.ref_count} "
+                         f"vertices={mesh.vertex_count} indices={mesh.index_count} "
+                         f"lod triangles={[count // 3 for first, count in mesh.lods]} "
+                         f"bytes={mesh.nbytes} (non-indexed {mesh.expanded_nbytes})")
+        lines.append(f"{len(self.meshes)} meshes, {self.bytes_resident() / 1024:.1f} KiB resident")
+        return "\n".join(lines)
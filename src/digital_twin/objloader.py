@@ -0,0 +1,272 @@
+# objloader.py
+
+import os
+import re
+import sys
+import glob
+import json
+import hashlib
+import numpy as np
+
+# one regex per record type, the whole file is tokenized in bulk
+_RE_V = re.compile(r"^[ \t]*v[ \t]+([^\n]*)", re.MULTILINE)
+_RE_VT = re.compile(r"^[ \t]*vt[ \t]+([^\n]*)", re.MULTILINE)
+_RE_VN = re.compile(r"^[ \t]*vn[ \t]+([^\n]*)", re.MULTILINE)
+_RE_F = re.compile(r"^[ \t]*f[ \t]+([^\n]*)", re.MULTILINE)
+
+def _parse_block(rows: list, width: int) -> np.ndarray:
+    # parse a list of "x y z ..." rows into a (len(rows), width) float64 array
+    if not rows:
+        return np.zeros((0, width), dtype=np.float64)
+    values = np.fromstring(" ".join(rows), dtype=np.float64, sep=" ")
+    n = len(rows[0].split())
+    if n >= width and len(values) == n * len(rows):
+        return values.reshape(len(rows), n)[:, :width]
+    # rows with a varying number of components (e.g. optional w)
+    return np.array([[float(x) for x in row.split()[:width]] for row in rows], dtype=np.float64)
+
+def _parse_faces(rows: list):
+    # returns (indices, counts): indices is (corners, k) with -1 for missing
+    # entries and counts is the number of corners of every face
+    if not rows:
+        return np.zeros((0, 1), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    k = rows[0].split()[0].count("/") + 1
+    text = " ".join(rows).replace("//", "/0/").replace("/", " ")
+    # obj indices are 1-based, 0 marks a missing uv/normal index
+    indices = np.fromstring(text, dtype=np.int64, sep=" ").reshape(-1, k) - 1
+    corners = len(indices)
+    if corners == 3 * len(rows):
+        counts = np.full(len(rows), 3, dtype=np.int64)
+    else:
+        counts = np.array([len(row.split()) for row in rows], dtype=np.int64)
+    return indices, counts
+
+def read_obj(filename: str, color=[1, 1, 1]):
+    with open(filename) as f:
+        text = f.read()
+
+    vertices = _parse_block(_RE_V.findall(text), 3)
+    uvs_loaded = _parse_block(_RE_VT.findall(text), 2)
+    normals_loaded = _parse_block(_RE_VN.findall(text), 3)
+    indices, counts = _parse_faces(_RE_F.findall(text))
+
+    # ---------------- positions ---------------- #
+    positions = vertices[indices[:, 0]]
+
+    # -------------- face normals -------------- #
+    starts = np.cumsum(counts) - counts
+    v1 = vertices[indices[starts, 0]]
+    v2 = vertices[indices[starts + 1, 0]]
+    v3 = vertices[indices[starts + 2, 0]]
+    face_normals = np.cross(v2 - v1, v3 - v1)
+    lengths = np.linalg.norm(face_normals, axis=1)
+    degenerate = lengths <= 0
+    face_normals[~degenerate] /= lengths[~degenerate, None]
+    face_normals[degenerate] = [0.0, 1.0, 0.0]
+    normals = np.repeat(face_normals, counts, axis=0)
+
+    # use loaded normals where the face provides them
+    if indices.shape[1] > 2 and len(normals_loaded):
+        has_normal = indices[:, 2] >= 0
+        normals[has_normal] = normals_loaded[indices[has_normal, 2]]
+
+    # ------------------ uvs ------------------ #
+    uvs = np.zeros((len(indices), 2), dtype=np.float64)
+    if indices.shape[1] > 1:
+        has_uv = indices[:, 1] >= 0
+        uvs[has_uv] = uvs_loaded[indices[has_uv, 1]]
+
+    colors = np.empty((len(indices), 3), dtype=np.float32)
+    colors[:] = color
+
+    return positions.astype(np.float32), colors, normals.astype(np.float32), uvs.astype(np.float32)
+
+def index_vertices(vertices: np.ndarray, normals: np.ndarray):
+    # deduplicate (position, normal) pairs of an expanded triangle list into
+    # one interleaved [px py pz nx ny nz] array plus a uint32 index buffer
+    interleaved = np.ascontiguousarray(np.hstack((vertices, normals)), dtype=np.float32)
+    rows = interleaved.view(np.dtype((np.void, interleaved.dtype.itemsize * 6))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    # keep the vertices in first-use order, it is friendlier to the vertex cache
+    order = np.argsort(first)
+    remap = np.empty(len(order), dtype=np.uint32)
+    remap[order] = np.arange(len(order), dtype=np.uint32)
+    return interleaved[first[order]], remap[inverse.ravel()]
+
+# ------------------------------------------------------------
+# level of detail
+# ------------------------------------------------------------
+
+# vertex clustering cell of every decimated level, as a fraction of the
+# bounding box diagonal. level 0 is the full mesh
+LOD_CELLS = (1 / 64, 1 / 24, 1 / 10)
+
+def decimate(interleaved: np.ndarray, indices: np.ndarray, cell_fraction: float):
+    # vertex clustering: snap the vertices to a grid, merge every cell into
+    # its mean position and drop the triangles that collapse. normals are
+    # recomputed (area weighted, smooth). same output format as index_vertices
+    positions = np.asarray(interleaved[:, :3], dtype=np.float64)
+    lo = positions.min(axis=0)
+    cell = max(np.linalg.norm(positions.max(axis=0) - lo) * cell_fraction, 1e-9)
+    cells = np.floor((positions - lo) / cell).astype(np.int64)
+    _, cluster = np.unique(cells, axis=0, return_inverse=True)
+    cluster = cluster.ravel()
+    counts = np.bincount(cluster)
+    centers = np.stack([np.bincount(cluster, positions[:, k]) for k in range(3)], axis=1) / counts[:, None]
+
+    triangles = cluster[np.asarray(indices).reshape(-1, 3)]
+    keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])
+    triangles = triangles[keep]
+    # triangles that collapsed onto the same three clusters
+    _, first = np.unique(np.sort(triangles, axis=1), axis=0, return_index=True)
+    triangles = triangles[np.sort(first)]
+    used, remap = np.unique(triangles, return_inverse=True)
+    triangles = remap.reshape(-1, 3)
+    vertices = centers[used]
+
+    v = vertices[triangles]
+    face_normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    normals = np.zeros_like(vertices)
+    for k in range(3):
+        np.add.at(normals, triangles[:, k], face_normals)
+    lengths = np.linalg.norm(normals, axis=1)
+    degenerate = lengths <= 0
+    normals[~degenerate] /= lengths[~degenerate, None]
+    normals[degenerate] = [0.0, 1.0, 0.0]
+    return np.hstack((vertices, normals)).astype(np.float32), triangles.ravel().astype(np.uint32)
+
+def build_lods(interleaved: np.ndarray, indices: np.ndarray) -> list:
+    # [(interleaved, indices)] from full detail to coarsest
+    lods = [(interleaved, indices)]
+    for cell_fraction in LOD_CELLS:
+        lods.append(decimate(interleaved, indices, cell_fraction))
+    return lods
+
+# ------------------------------------------------------------
+# binary cache
+# ------------------------------------------------------------
+
+# bump when the loader output changes so stale caches get rebuilt
+CACHE_VERSION = 3
+LOD_ARRAYS = tuple(f"lod{level}_{key}" for level in range(1, len(LOD_CELLS) + 1) for key in ("interleaved", "indices"))
+CACHE_ARRAYS = ("vertices", "normals", "uvs", "interleaved", "indices") + LOD_ARRAYS
+
+def _cache_paths(filename: str):
+    directory, name = os.path.split(filename)
+    stem = os.path.splitext(name)[0]
+    cache_dir = os.path.join(directory, ".cache")
+    meta = os.path.join(cache_dir, f"{stem}.json")
+    arrays = {key: os.path.join(cache_dir, f"{stem}.{key}.npy") for key in CACHE_ARRAYS}
+    return cache_dir, meta, arrays
+
+def _file_hash(filename: str) -> str:
+    with open(filename, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _cache_valid(filename: str, meta_path: str, arrays: dict) -> bool:
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get("version") != CACHE_VERSION or not all(os.path.exists(p) for p in arrays.values()):
+        return False
+    stat = os.stat(filename)
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return True
+    # mtime changed (checkout, copy), only rebuild if the content did too
+    if meta.get("sha1") != _file_hash(filename):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    meta["size"] = stat.st_size
+    try:
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+    except OSError:
+        pass
+    return True
+
+def bake_obj(filename: str) -> None:
+    cache_dir, meta_path, arrays = _cache_paths(filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(filename)
+    vertices, colors, normals, uvs = read_obj(filename)
+    interleaved, indices = index_vertices(vertices, normals)
+    lods = build_lods(interleaved, indices)
+    lod_data = [data for lod in lods[1:] for data in lod]
+    for key, data in zip(CACHE_ARRAYS, (vertices, normals, uvs, interleaved, indices, *lod_data)):
+        # write then rename so a crash never leaves a truncated cache
+        tmp_path = arrays[key] + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp_path, arrays[key])
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.basename(filename),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": _file_hash(filename),
+        "vertex_count": len(vertices),
+        "indexed_vertex_count": len(interleaved),
+        "lod_triangle_counts": [len(lod[1]) // 3 for lod in lods],
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+def _load_cached(filename: str, keys):
+    # memory-mapped .npy sidecars, created on first load and rebuilt when the
+    # source changes. returns None if the cache can't be written or read
+    cache_dir, meta_path, arrays = _cache_paths(filename)
+    for attempt in range(2):
+        if attempt or not _cache_valid(filename, meta_path, arrays):
+            try:
+                bake_obj(filename)
+            except OSError as e:
+                print(f"mesh cache: could not write cache for {filename}: {e}")
+                return None
+        try:
+            return [np.load(arrays[key], mmap_mode="r") for key in keys]
+        except (OSError, ValueError, EOFError) as e:
+            # truncated or corrupt sidecar (interrupted bake, full disk), rebake once
+            print(f"mesh cache: could not read cache for {filename}: {e}")
+    return None
+
+def load_obj(filename: str, color=[1, 1, 1]):
+    # same output as read_obj, served from the cache
+    cached = _load_cached(filename, ("vertices", "normals", "uvs"))
+    if cached is None:
+        return read_obj(filename, color)
+    vertices, normals, uvs = cached
+    colors = np.empty((len(vertices), 3), dtype=np.float32)
+    colors[:] = color
+    return vertices, colors, normals, uvs
+
+def load_indexed_obj(filename: str):
+    # (interleaved, indices) as produced by index_vertices, served from the cache
+    cached = _load_cached(filename, ("interleaved", "indices"))
+    if cached is None:
+        vertices, colors, normals, uvs = read_obj(filename)
+        return index_vertices(vertices, normals)
+    return tuple(cached)
+
+def load_lods(filename: str) -> list:
+    # [(interleaved, indices)] of every level, level 0 is load_indexed_obj
+    keys = ("interleaved", "indices") + LOD_ARRAYS
+    cached = _load_cached(filename, keys)
+    if cached is None:
+        vertices, colors, normals, uvs = read_obj(filename)
+        return build_lods(*index_vertices(vertices, normals))
+    return [tuple(cached[i:i + 2]) for i in range(0, len(cached), 2)]
+
+def bake_all(directory: str = "digital_twin/objects") -> None:
+    for filename in sorted(glob.glob(os.path.join(directory, "*.obj"))):
+        bake_obj(filename)
+        print(f"baked {filename}")
+
+class ReadOBJ:
+    def __init__(self, filename, color=[1, 1, 1]):
+        self.vertices, self.colors, self.normals, self.uvs = load_obj(filename, color)
+
+if __name__ == "__main__":
+    # offline "bake all meshes": python -m digital_twin.objloader [directory]
+    bake_all(*sys.argv[1:2])
@@ -0,0 +1,169 @@
+# offscreen.py
+#
+# renders the twin's Scene without a window: an EGL pbuffer or OSMesa
+# context and a framebuffer object the frames are drawn into. works with
+# software gl (mesa llvmpipe) and without wx, e.g. on a ci box. the caller
+# picks the context with PYOPENGL_PLATFORM=egl|osmesa before anything
+# imports OpenGL, see benchmarks/bench_offscreen.py
+
+import os
+import sys
+import time
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from digital_twin.vehiclestate import VehicleState
+from digital_twin.scene import Scene
+from digital_twin.renderprofiler import GLCallCounter
+
+class EGLContext:
+    def __init__(self, width: int, height: int):
+        from OpenGL import EGL
+        self.EGL = EGL
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("eglInitialize failed")
+
+        config_attribs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) or count.value == 0:
+            raise RuntimeError("no egl config with desktop gl and a pbuffer")
+
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attribs = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not self.context:
+            raise RuntimeError("could not create an opengl 3.3 core egl context")
+
+    def make_current(self) -> None:
+        self.EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context)
+
+    def release(self) -> None:
+        EGL = self.EGL
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglTerminate(self.display)
+
+class OSMesaContext:
+    def __init__(self, width: int, height: int):
+        from OpenGL import osmesa
+        self.osmesa = osmesa
+        attribs = (ctypes.c_int * 11)(
+            osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+            osmesa.OSMESA_DEPTH_BITS, 24,
+            osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+            osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+            osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3,
+            0)
+        self.context = osmesa.OSMesaCreateContextAttribs(attribs, None)
+        if not self.context:
+            raise RuntimeError("could not create an opengl 3.3 core osmesa context")
+        # osmesa needs a client buffer even though we draw into the fbo
+        self.width = width
+        self.height = height
+        self.buffer = np.zeros((height, width, 4), dtype=np.uint8)
+
+    def make_current(self) -> None:
+        self.osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL_UNSIGNED_BYTE, self.width, self.height)
+
+    def release(self) -> None:
+        self.osmesa.OSMesaDestroyContext(self.context)
+
+def create_context(width: int, height: int):
+    platform = os.environ.get("PYOPENGL_PLATFORM")
+    if platform == "egl":
+        return EGLContext(width, height)
+    if platform == "osmesa":
+        return OSMesaContext(width, height)
+    raise RuntimeError(f"offscreen rendering needs PYOPENGL_PLATFORM=egl or osmesa, not {platform}")
+
+# the modules the scene makes its gl calls from
+COUNTED_MODULES = ("digital_twin.scene", "digital_twin.meshregistry", "digital_twin.shaderprogram")
+
+class PassTimer:
+    # Scene.render hook, adds the cpu time of every pass to times[name]
+    def __init__(self, times: dict):
+        self.times = times
+
+    def run(self, name: str, step) -> None:
+        start = time.perf_counter()
+        step()
+        self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+class PassCallCounter:
+    # Scene.render hook, the gl calls of every pass, {pass: {function: calls}}
+    def __init__(self, counter: GLCallCounter):
+        self.counter = counter
+        self.calls = {}
+
+    def run(self, name: str, step) -> None:
+        self.counter.reset()
+        step()
+        self.calls[name] = self.counter.counts
+
+class OffscreenRenderer:
+    def __init__(self, vehicle_state: VehicleState, width: int = 1280, height: int = 720):
+        self.width = width
+        self.height = height
+        self.context = create_context(width, height)
+        self.context.make_current()
+
+        self.fbo = glGenFramebuffers(1)
+        self.renderbuffers = glGenRenderbuffers(2)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[0])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.renderbuffers[0])
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[1])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.renderbuffers[1])
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("offscreen framebuffer is incomplete")
+
+        self.scene = Scene(vehicle_state)
+        self.scene.init_gl()
+        self.scene.set_viewport(width, height)
+
+    def render(self, pass_times: dict = None) -> None:
+        # one frame. with pass_times, the cpu time of every scene pass is
+        # added to pass_times[name]
+        self.scene.render(None if pass_times is None else PassTimer(pass_times))
+
+    def count_calls(self) -> dict:
+        # gl calls per pass of one frame, {pass: {function: calls}}
+        counter = GLCallCounter([sys.modules[name] for name in COUNTED_MODULES])
+        passes = PassCallCounter(counter)
+        counter.install()
+        try:
+            self.scene.render(passes)
+        finally:
+            counter.uninstall()
+        return passes.calls
+
+    def read_pixels(self) -> np.ndarray:
+        # the last frame as (height, width, 3) rgb, top row first
+        glFinish()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3)[::-1]
+
+    def release(self) -> None:
+        self.context.make_current()
+        self.scene.release()
+        glDeleteRenderbuffers(2, self.renderbuffers)
+        glDeleteFramebuffers(1, [self.fbo])
+        self.context.release()
@@ -0,0 +1,204 @@
+# renderprofiler.py
+
+import json
+import time
+import numpy as np
+from OpenGL.GL import *
+
+# frames of gpu queries in flight, results are read this many frames later
+# so reading them never waits for the gpu
+QUERY_FRAMES = 3
+
+class GLCallCounter:
+    # counts the gl calls made from the given modules by swapping their gl*
+    # globals (from OpenGL.GL import *) for counting wrappers, only the
+    # functions starting with one of prefixes. the wrappers cost time, count
+    # a few functions or count on frames that aren't being timed
+    def __init__(self, modules: list, prefixes=("gl",)):
+        self.modules = modules
+        self.prefixes = prefixes
+        self.counts = {}
+        self.calls = 0
+        self.originals = []
+
+    def install(self) -> None:
+        for module in self.modules:
+            for name, function in list(vars(module).items()):
+                if name.startswith(self.prefixes) and name[2:3].isupper() and callable(function):
+                    self.originals.append((module, name, function))
+                    setattr(module, name, self.wrap(name, function))
+
+    def uninstall(self) -> None:
+        for module, name, function in self.originals:
+            setattr(module, name, function)
+        self.originals = []
+
+    def wrap(self, name: str, function):
+        def counted(*args, **kwargs):
+            self.calls += 1
+            self.counts[name] = self.counts.get(name, 0) + 1
+            return function(*args, **kwargs)
+        return counted
+
+    def reset(self) -> None:
+        self.counts = {}
+        self.calls = 0
+
+class RenderProfiler:
+    # cpu and gpu (GL_TIME_ELAPSED) time of every named pass of the last
+    # `history` frames, kept in rings. begin_frame, run and end_frame need
+    # the gl context current, they are called from the paint handler
+    def __init__(self, names: list, history: int = 600, counted_modules: list = ()):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.history = history
+        self.frame = 0
+        self.queries = None
+        self.query_frames = [None] * QUERY_FRAMES
+        self.frame_start = 0.0
+
+        self.timestamps = np.zeros(history)
+        self.frame_times = np.full(history, np.nan)
+        self.draw_calls = np.zeros(history, dtype=np.int64)
+        self.pass_starts = np.full((history, len(self.names)), np.nan)
+        self.cpu_times = np.full((history, len(self.names)), np.nan)
+        self.gpu_times = np.full((history, len(self.names)), np.nan)
+
+        self.counter = GLCallCounter(counted_modules, ("glDraw", "glMultiDraw"))
+        self.counter.install()
+
+    def begin_frame(self) -> None:
+        if self.queries is None:
+            self.queries = np.asarray(glGenQueries(QUERY_FRAMES * len(self.names))).reshape(QUERY_FRAMES, len(self.names))
+        slot = self.frame % QUERY_FRAMES
+        if self.query_frames[slot] is not None:
+            self.read_queries(slot)
+        self.query_frames[slot] = self.frame
+
+        row = self.frame % self.history
+        self.pass_starts[row] = np.nan
+        self.cpu_times[row] = np.nan
+        self.gpu_times[row] = np.nan
+        self.counter.reset()
+        self.frame_start = time.perf_counter()
+        self.timestamps[row] = self.frame_start
+
+    def run(self, name: str, step) -> None:
+        row = self.frame % self.history
+        i = self.index[name]
+        query = self.queries[self.frame % QUERY_FRAMES, i]
+        glBeginQuery(GL_TIME_ELAPSED, int(query))
+        start = time.perf_counter()
+        step()
+        self.cpu_times[row, i] = time.perf_counter() - start
+        glEndQuery(GL_TIME_ELAPSED)
+        self.pass_starts[row, i] = start - self.frame_start
+
+    def end_frame(self) -> None:
+        row = self.frame % self.history
+        self.frame_times[row] = time.perf_counter() - self.frame_start
+        self.draw_calls[row] = self.counter.calls
+        self.frame += 1
+
+    def read_queries(self, slot: int) -> None:
+        # gpu times of the frame that used this slot QUERY_FRAMES frames ago
+        frame = self.query_frames[slot]
+        self.query_frames[slot] = None
+        if self.frame - frame >= self.history:
+            return
+        row = frame % self.history
+        for i, query in enumerate(self.queries[slot]):
+            if np.isnan(self.cpu_times[row, i]):
+                continue
+            self.gpu_times[row, i] = glGetQueryObjectui64v(int(query), GL_QUERY_RESULT) * 1e-9
+
+    def rows(self) -> np.ndarray:
+        # ring rows of the recorded frames, oldest first
+        count = min(self.frame, self.history)
+        return np.arange(self.frame - count, self.frame) % self.history
+
+    def fps(self, window: float = 1.0) -> float:
+        rows = self.rows()
+        if len(rows) == 0:
+            return 0.0
+        timestamps = self.timestamps[rows]
+        return float(np.count_nonzero(timestamps >= time.perf_counter() - window)) / window
+
+    def stats(self) -> dict:
+        rows = self.rows()
+        if len(rows) == 0:
+            return {}
+        frame_times = self.frame_times[rows] * 1000
+        cpu = self.cpu_times[rows] * 1000
+        gpu = self.gpu_times[rows] * 1000
+        intervals = np.diff(self.timestamps[rows]) * 1000
+        with np.errstate(all="ignore"):
+            return {
+                "fps": self.fps(),
+                "frame_p50": float(np.percentile(frame_times, 50)),
+                "frame_p99": float(np.percentile(frame_times, 99)),
+                "interval_p99": float(np.percentile(intervals, 99)) if len(intervals) else 0.0,
+                "draw_calls": int(self.draw_calls[rows[-1]]),
+                "passes": {
+                    name: {
+                        "cpu_p50": float(np.nanpercentile(cpu[:, i], 50)),
+                        "cpu_p99": float(np.nanpercentile(cpu[:, i], 99)),
+                        "gpu_p50": float(np.nanpercentile(gpu[:, i], 50)) if np.any(~np.isnan(gpu[:, i])) else float("nan"),
+                    } for i, name in enumerate(self.names)
+                },
+            }
+
+    def summary(self) -> str:
+        # one line for the status bar
+        stats = self.stats()
+        if not stats:
+            return ""
+        slowest = max(stats["passes"].items(), key=lambda item: np.nan_to_num(item[1]["cpu_p99"]))
+        return (f"{stats['fps']:.0f} fps  {stats['frame_p50']:.1f}/{stats['frame_p99']:.1f} ms p50/p99  "
+                f"{stats['draw_calls']} draws  slowest {slowest[0]} {slowest[1]['cpu_p99']:.1f} ms")
+
+    def histogram(self, name: str = None, bins: int = 20) -> tuple:
+        # (counts, edges) of the frame time, or of one pass' cpu time, in ms
+        rows = self.rows()
+        values = self.frame_times[rows] if name is None else self.cpu_times[rows, self.index[name]]
+        values = values[~np.isnan(values)] * 1000
+        return np.histogram(values, bins=bins)
+
+    def export_csv(self, path: str) -> None:
+        rows = self.rows()
+        header = ["frame", "time", "frame_ms", "draw_calls"]
+        for name in self.names:
+            header += [f"{name}_cpu_ms", f"{name}_gpu_ms"]
+        first = self.frame - len(rows)
+        with open(path, "w") as f:
+            f.write(",".join(header) + "\n")
+            for n, row in enumerate(rows):
+                values = [str(first + n), f"{self.timestamps[row]:.6f}", f"{self.frame_times[row] * 1000:.4f}", str(self.draw_calls[row])]
+                for i in range(len(self.names)):
+                    values += [f"{self.cpu_times[row, i] * 1000:.4f}", f"{self.gpu_times[row, i] * 1000:.4f}"]
+                f.write(",".join(values) + "\n")
+
+    def export_trace(self, path: str) -> None:
+        # chrome trace event format (chrome://tracing, perfetto). cpu spans,
+        # the gpu time of every pass is in its args
+        events = []
+        rows = self.rows()
+        first = self.frame - len(rows)
+        for n, row in enumerate(rows):
+            frame_start = self.timestamps[row] * 1e6
+            events.append({"name": "frame", "ph": "X", "pid": 0, "tid": 0, "ts": frame_start,
+                           "dur": self.frame_times[row] * 1e6, "args": {"frame": first + n, "draw_calls": int(self.draw_calls[row])}})
+            for i, name in enumerate(self.names):
+                if np.isnan(self.cpu_times[row, i]):
+                    continue
+                args = {} if np.isnan(self.gpu_times[row, i]) else {"gpu_ms": self.gpu_times[row, i] * 1000}
+                events.append({"name": name, "ph": "X", "pid": 0, "tid": 0, "ts": frame_start + self.pass_starts[row, i] * 1e6,
+                               "dur": self.cpu_times[row, i] * 1e6, "args": args})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def release(self) -> None:
+        self.counter.uninstall()
+        if self.queries is not None:
+            glDeleteQueries(self.queries.size, self.queries.ravel())
+            self.queries = None
@@ -0,0 +1,51 @@
+# renderscheduler.py
+
+import wx
+import time
+
+class RenderScheduler:
+    # repaints a window only when something asked for it (new telemetry,
+    # camera input, running animation), never faster than target_fps
+    def __init__(self, window: wx.Window, target_fps: float = 60.0):
+        self.window = window
+        self.target_fps = target_fps
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.pending = False
+        self.thread_request = False
+        self.last_frame_time = 0.0
+        self.frame_count = 0
+
+    def request(self) -> None:
+        # gui thread only
+        if self.pending:
+            return
+        self.pending = True
+        wait = self.last_frame_time + 1.0 / self.target_fps - time.perf_counter()
+        if wait <= 0:
+            self.window.Refresh(False)
+        else:
+            self.timer.StartOnce(max(1, int(wait * 1000)))
+
+    def request_threadsafe(self) -> None:
+        # may be called from any thread, bursts collapse into one CallAfter
+        if self.thread_request:
+            return
+        self.thread_request = True
+        wx.CallAfter(self._drain_thread_request)
+
+    def _drain_thread_request(self) -> None:
+        self.thread_request = False
+        if self.window:
+            self.request()
+
+    def frame_rendered(self) -> None:
+        self.pending = False
+        self.last_frame_time = time.perf_counter()
+        self.frame_count += 1
+
+    def stop(self) -> None:
+        self.timer.Stop()
+
+    def OnTimer(self, event: wx.TimerEvent):
+        self.window.Refresh(False)
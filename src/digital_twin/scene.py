@@ -0,0 +1,920 @@
+# scene.py
+#
+# the twin's gl objects and the Scene that draws them, no windowing: used by
+# PanelView (view.py) and by the offscreen renderer
+
+import glm
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from math import sin, cos
+from digital_twin.meshregistry import MeshRegistry, Mesh, InstanceBatch
+from digital_twin.shaderprogram import ShaderProgram, ShaderCache, FrameUniformBuffer, SOURCE_FRAME_DATA
+from digital_twin.vehiclestate import VehicleState, lod_windows
+from digital_twin.kinematics import KinematicTree, ARM_LINKS, ARM_JOINT_COUNT
+from digital_twin.frustum import Frustum, transform_spheres
+import time
+from random import uniform
+
+class Camera:
+    def __init__(self):
+        self.position = glm.vec3(0.0, 0.0, 30.0)
+        self.front = glm.vec3(0.0, 0.0, -1.0)
+        self.up = glm.vec3(0.0, 1.0, 0.0)
+        
+        self.yaw = -90.0
+        self.pitch = 0.0
+        self.fov = 80.0
+        self.near = 0.1
+        self.far = 100000
+        self.projection = glm.perspective(glm.radians(self.fov), 1, self.near, self.far)
+        self.viewport_height = 300
+        # updated every frame, for culling and level of detail
+        self.frustum = Frustum()
+
+# ------------------------------------------------------------
+# shared shader sources
+# ------------------------------------------------------------
+
+SOURCE_PHONG_VERTEX = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + """
+uniform mat4 model;
+
+uniform vec3 object_color;
+
+layout (location = 0) in vec3 vertex_position;
+layout (location = 2) in vec3 vertex_normal;
+
+out vec3 normal;
+out vec3 color;
+out vec3 frag_pos;
+
+void main() {
+  normal = mat3(transpose(inverse(model))) * vertex_normal;
+  color = object_color;
+  frag_pos = vec3(model * vec4(vertex_position, 1.0));
+  gl_Position = projection * view * model * vec4(vertex_position, 1.0);
+}
+"""
+
+# material and directional light, shared by the phong fragment shaders
+SOURCE_PHONG_LIGHTING = """
+struct Material {
+  float shininess;
+  vec3 ambient;
+  vec3 diffuse;
+  vec3 specular;
+};
+
+uniform bool bool_lighting;
+uniform Material material;
+
+vec3 CalcLightDir(LightDirectional light, vec3 normal, vec3 view_dir, vec3 color) {
+  vec3 light_dir = normalize(-light.direction);
+  float diff = max(dot(normal, light_dir), 0.0);
+  vec3 reflect_dir = reflect(-light_dir, normal);
+  float spec = pow(max(dot(view_dir, reflect_dir), 0.0), material.shininess);
+
+  vec3 ambient = light.ambient * material.ambient;
+  vec3 diffuse = light.diffuse * diff * material.diffuse;
+  vec3 specular = light.specular * spec * material.specular;
+
+  return (ambient + diffuse + specular) * color;
+}
+
+vec3 Shade(vec3 normal, vec3 frag_pos, vec3 color) {
+  if (!bool_lighting) {
+    return color;
+  }
+  vec3 norm = normalize(normal);
+  vec3 view_dir = normalize(view_pos - frag_pos);
+  return CalcLightDir(light_directional, norm, view_dir, color);
+}
+"""
+
+SOURCE_PHONG_FRAGMENT = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + SOURCE_PHONG_LIGHTING + """
+in vec3 color;
+in vec3 normal;
+in vec3 frag_pos;
+out vec4 frag_color;
+
+void main() {
+  frag_color = vec4(Shade(normal, frag_pos, color), 1.0);
+}
+"""
+
+# single-pass wireframe overlay: the geometry shader gives every triangle
+# corner a barycentric coordinate and the fragment shader darkens pixels
+# close to an edge, constant width in screen space thanks to fwidth. works
+# with indexed meshes and with either phong vertex shader
+
+SOURCE_OVERLAY_GEOMETRY = """
+#version 330 core
+layout (triangles) in;
+layout (triangle_strip, max_vertices = 3) out;
+
+in vec3 normal[];
+in vec3 color[];
+in vec3 frag_pos[];
+
+out vec3 g_normal;
+out vec3 g_color;
+out vec3 g_frag_pos;
+noperspective out vec3 barycentric;
+
+const vec3 corners[3] = vec3[3](vec3(1.0, 0.0, 0.0), vec3(0.0, 1.0, 0.0), vec3(0.0, 0.0, 1.0));
+
+void main() {
+  for (int i = 0; i < 3; i++) {
+    gl_Position = gl_in[i].gl_Position;
+    g_normal = normal[i];
+    g_color = color[i];
+    g_frag_pos = frag_pos[i];
+    barycentric = corners[i];
+    EmitVertex();
+  }
+  EndPrimitive();
+}
+"""
+
+SOURCE_OVERLAY_FRAGMENT = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + SOURCE_PHONG_LIGHTING + """
+uniform vec3 wire_color;
+uniform float wire_width;
+
+in vec3 g_normal;
+in vec3 g_color;
+in vec3 g_frag_pos;
+noperspective in vec3 barycentric;
+out vec4 frag_color;
+
+void main() {
+  vec3 result = Shade(g_normal, g_frag_pos, g_color);
+  // 1 on an edge, fading to 0 wire_width pixels away from it
+  vec3 width = fwidth(barycentric) * wire_width;
+  vec3 inside = smoothstep(vec3(0.0), width, barycentric);
+  float edge = 1.0 - min(min(inside.x, inside.y), inside.z);
+  frag_color = vec4(mix(result, wire_color, edge), 1.0);
+}
+"""
+
+SOURCE_WIRE_VERTEX = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + """
+layout (location = 0) in vec3 v_pos;
+
+uniform mat4 model;
+
+void main() {
+  gl_Position = projection * view * model * vec4(v_pos, 1.0f);
+}
+"""
+
+# instanced variants: the model matrix is a per-instance attribute
+# (InstanceBatch) instead of a uniform
+
+SOURCE_PHONG_INSTANCED_VERTEX = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + """
+uniform vec3 object_color;
+
+layout (location = 0) in vec3 vertex_position;
+layout (location = 2) in vec3 vertex_normal;
+layout (location = 3) in mat4 instance_model;
+
+out vec3 normal;
+out vec3 color;
+out vec3 frag_pos;
+
+void main() {
+  normal = mat3(transpose(inverse(instance_model))) * vertex_normal;
+  color = object_color;
+  frag_pos = vec3(instance_model * vec4(vertex_position, 1.0));
+  gl_Position = projection * view * instance_model * vec4(vertex_position, 1.0);
+}
+"""
+
+SOURCE_WIRE_INSTANCED_VERTEX = """
+#version 330 core
+""" + SOURCE_FRAME_DATA + """
+layout (location = 0) in vec3 v_pos;
+layout (location = 3) in mat4 instance_model;
+
+void main() {
+  gl_Position = projection * view * instance_model * vec4(v_pos, 1.0f);
+}
+"""
+
+SOURCE_WIRE_FRAGMENT = """
+#version 330 core
+uniform vec3 wire_color;
+out vec4 FragColor;
+void main() {
+  FragColor = vec4(wire_color, 1.0f);
+}
+"""
+
+def set_material_uniforms(shader_program: ShaderProgram, material_data: dict, color) -> None:
+
+    # fragment uniforms, camera and light come from the FrameData block
+
+    shader_program.set_bool("bool_lighting", True)
+    shader_program.set_vec3("object_color", color)
+
+    shader_program.set_float("material.shininess", material_data["shininess"])
+    shader_program.set_vec3("material.ambient", material_data["ambient"])
+    shader_program.set_vec3("material.diffuse", material_data["diffuse"])
+    shader_program.set_vec3("material.specular", material_data["specular"])
+
+class VehicleBase:
+    def __init__(self):
+
+        self.shader_program = None
+        self.mesh = None
+        self.color = [1.0, 1.0, 1.0]
+        self.wire_color = [0.0, 0.0, 0.0]
+        # "overlay" (single pass edges), "two_pass" (line pass + solid pass) or "off"
+        self.wireframe = "overlay"
+        self.wire_width = 1.5
+        self.model = glm.mat4(1.0)
+
+        self.material_data = {
+            "shininess": 64.0,
+            "ambient": [0.2, 0.2, 0.2],
+            "diffuse": [0.3, 0.3, 0.3],
+            "specular": [0.5, 0.5, 0.5]
+        }
+
+    def init_object(self, mesh_registry: MeshRegistry, shader_cache: ShaderCache) -> None:
+
+        # ------------------------------------------------------------
+        # compilation
+        # ------------------------------------------------------------
+
+        self.shader_program = shader_cache.get(SOURCE_PHONG_VERTEX, SOURCE_PHONG_FRAGMENT)
+        self.shader_program_wire = shader_cache.get(SOURCE_WIRE_VERTEX, SOURCE_WIRE_FRAGMENT)
+        self.shader_program_overlay = shader_cache.get(SOURCE_PHONG_VERTEX, SOURCE_OVERLAY_FRAGMENT, SOURCE_OVERLAY_GEOMETRY)
+
+        self.mesh = mesh_registry.acquire("digital_twin/objects/rocky.obj")
+
+    def release_object(self, mesh_registry: MeshRegistry) -> None:
+        mesh_registry.release(self.mesh)
+
+    def get_position(self) -> glm.vec3:
+        return glm.vec3(self.model[3][0],
+                        self.model[3][1],
+                        self.model[3][2])
+    
+    def set_position(self, new_position: glm.vec3):
+        rotation_scale_matrix = glm.mat4(
+            self.model[0],
+            self.model[1],
+            self.model[2],
+            glm.vec4(0.0, 0.0, 0.0, 1.0)
+        )
+        translation_matrix = glm.translate(glm.mat4(1.0), new_position)
+        self.model = translation_matrix * rotation_scale_matrix
+
+    def draw_object(self, camera: Camera) -> None:
+
+        if self.shader_program == None:
+            return
+
+        # ----------- culling and level of detail ----------- #
+
+        model = np.array(self.model.to_list(), dtype=np.float64).T
+        center, radius = transform_spheres(model, self.mesh.center, self.mesh.radius)
+        if not camera.frustum.visible(center, radius):
+            return
+        lod = camera.frustum.select_lod(center, radius, len(self.mesh.lods))
+
+        # ----------- solid with edge overlay ----------- #
+
+        if self.wireframe == "overlay":
+            self.shader_program_overlay.use()
+            self.shader_program_overlay.set_mat4("model", self.model)
+            set_material_uniforms(self.shader_program_overlay, self.material_data, self.color)
+            self.shader_program_overlay.set_vec3("wire_color", self.wire_color)
+            self.shader_program_overlay.set_float("wire_width", self.wire_width)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            self.mesh.draw(lod=lod)
+            return
+
+        # ----------- draw in wireframe ----------- #
+
+        if self.wireframe == "two_pass":
+            self.shader_program_wire.use()
+            self.shader_program_wire.set_mat4("model", self.model)
+            self.shader_program_wire.set_vec3("wire_color", self.wire_color)
+            glLineWidth(2)
+            glEnable(GL_CULL_FACE)
+            glCullFace(GL_FRONT)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            self.mesh.draw(lod=lod)
+
+        # ----------- redraw as solid ----------- #
+
+        self.shader_program.use()
+        self.shader_program.set_mat4("model", self.model)
+        set_material_uniforms(self.shader_program, self.material_data, self.color)
+        
+        glDisable(GL_CULL_FACE)
+        glCullFace(GL_BACK)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        self.mesh.draw(lod=lod)
+
+class VehicleArm:
+    def __init__(self, arm_id=1):
+
+        self.shader_program = None
+        self.color = [1.0, 1.0, 1.0]
+        self.wire_color = [0.4, 0.4, 0.4]
+        # "overlay" (single pass edges), "two_pass" (line pass + solid pass) or "off"
+        self.wireframe = "overlay"
+        self.wire_width = 1.0
+        # joint angles come from rocky/arm/<arm_id>, animate replaces them
+        # with a demo sweep and keeps the view repainting while enabled
+        self.arm_id = arm_id
+        self.animate = False
+        self.kinematics = KinematicTree(ARM_LINKS, ARM_JOINT_COUNT)
+        self.meshes = []
+        # links that share a mesh are drawn together, one instanced call per
+        # distinct mesh. ghost poses (planning previews) are extra instances
+        self.batches = []
+        self.batch_links = []
+        self.ghost_joint_angles = None
+        self.ghost_revision = 0
+        # instance matrices are re-uploaded only when the joints, the base,
+        # the ghost poses or the set of visible links changed
+        self.instances_key = None
+        self.world = None
+        self.visible = None
+        self.batch_lods = []
+
+        self.material_data = {
+            "shininess": 64.0,
+            "ambient": [0.2, 0.2, 0.2],
+            "diffuse": [0.2, 0.2, 0.2],
+            "specular": [0.5, 0.5, 0.5]
+        }
+
+    @property
+    def joint_angles(self):
+        return self.kinematics.joint_angles
+
+    def set_joint_angles(self, joint_angles) -> None:
+        self.kinematics.set_joint_angles(joint_angles)
+
+    def set_ghost_poses(self, joint_angles) -> None:
+        # (poses, joints) angles drawn as extra arms on the same base, or None
+        self.ghost_joint_angles = None if joint_angles is None else np.atleast_2d(np.asarray(joint_angles, dtype=np.float64))
+        self.ghost_revision += 1
+
+    def init_object(self, mesh_registry: MeshRegistry, shader_cache: ShaderCache) -> None:
+
+        # ------------------------------------------------------------
+        # shaders
+        # ------------------------------------------------------------
+
+        self.shader_program = shader_cache.get(SOURCE_PHONG_INSTANCED_VERTEX, SOURCE_PHONG_FRAGMENT)
+        self.shader_program_wire = shader_cache.get(SOURCE_WIRE_INSTANCED_VERTEX, SOURCE_WIRE_FRAGMENT)
+        self.shader_program_overlay = shader_cache.get(SOURCE_PHONG_INSTANCED_VERTEX, SOURCE_OVERLAY_FRAGMENT, SOURCE_OVERLAY_GEOMETRY)
+
+        # ------------------------------------------------------------
+        # read obj files
+        # ------------------------------------------------------------
+
+        # one mesh per link, only 5 distinct files so the registry uploads each one once
+        self.meshes = [mesh_registry.acquire(link.mesh) for link in self.kinematics.links]
+
+        # group the links by mesh
+        groups = {}
+        for i, mesh in enumerate(self.meshes):
+            groups.setdefault(mesh.key, (mesh, []))[1].append(i)
+        self.batches = [InstanceBatch(mesh) for mesh, links in groups.values()]
+        self.batch_links = [np.array(links) for mesh, links in groups.values()]
+        # object space bounding sphere of every link
+        self.link_centers = np.array([mesh.center for mesh in self.meshes])
+        self.link_radii = np.array([mesh.radius for mesh in self.meshes])
+
+    def release_object(self, mesh_registry: MeshRegistry) -> None:
+        for batch in self.batches:
+            batch.delete()
+        for mesh in self.meshes:
+            mesh_registry.release(mesh)
+        self.batches = []
+        self.meshes = []
+        self.instances_key = None
+
+    def draw_batches(self):
+
+        # ----------- solid with edge overlay ----------- #
+
+        if self.wireframe == "overlay":
+            self.shader_program_overlay.use()
+            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            for batch, lod in zip(self.batches, self.batch_lods):
+                batch.draw(lod=lod)
+            return
+
+        # ----------- draw in wireframe ----------- #
+
+        if self.wireframe == "two_pass":
+            self.shader_program_wire.use()
+            glEnable(GL_CULL_FACE)
+            glCullFace(GL_FRONT)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            for batch, lod in zip(self.batches, self.batch_lods):
+                batch.draw(lod=lod)
+
+        # ----------- redraw as solid ----------- #
+
+        self.shader_program.use()
+        glDisable(GL_CULL_FACE)
+        glCullFace(GL_BACK)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        for batch, lod in zip(self.batches, self.batch_lods):
+            batch.draw(lod=lod)
+
+    def update_instances(self, base: glm.mat4, frustum: Frustum) -> None:
+        # the revision only changes when a joint angle changed
+        relative = self.kinematics.relative_transforms()
+        key = (self.kinematics.revision, self.ghost_revision, base.to_tuple())
+        if key != self.instances_key:
+            poses = relative[None]
+            if self.ghost_joint_angles is not None:
+                poses = np.concatenate((poses, self.kinematics.forward_batch(self.ghost_joint_angles)))
+            # (poses, links, 4, 4) in world space, and the links' bounding spheres
+            self.world = np.array(base.to_list(), dtype=np.float64).T @ poses
+            self.centers, self.radii = transform_spheres(self.world, self.link_centers, self.link_radii)
+            self.instances_key = key
+            self.visible = None
+
+        # culled every frame, the camera moves on its own. a batch is drawn
+        # at the finest level any of its visible links needs
+        visible = frustum.visible_spheres(self.centers, self.radii)
+        lods = frustum.select_lods(self.centers, self.radii, max(len(mesh.lods) for mesh in self.meshes))
+        self.batch_lods = []
+        for batch, links in zip(self.batches, self.batch_links):
+            shown = visible[:, links]
+            lod = int(lods[:, links][shown].min()) if shown.any() else 0
+            self.batch_lods.append(min(lod, len(batch.mesh.lods) - 1))
+        if self.visible is not None and np.array_equal(visible, self.visible):
+            return
+        for batch, links in zip(self.batches, self.batch_links):
+            batch.update(self.world[:, links][visible[:, links]])
+        self.visible = visible
+
+    def draw_object(self, camera: Camera, vehicle_base: VehicleBase) -> None:
+
+        if self.shader_program == None:
+            return
+
+        if self.animate:
+            t = time.time()
+            self.set_joint_angles([sin(t), sin(t), cos(t) * 2])
+
+        # uniforms shared by every part, the models are per instance
+        if self.wireframe == "overlay":
+            self.shader_program_overlay.use()
+            set_material_uniforms(self.shader_program_overlay, self.material_data, self.color)
+            self.shader_program_overlay.set_vec3("wire_color", self.wire_color)
+            self.shader_program_overlay.set_float("wire_width", self.wire_width)
+        else:
+            self.shader_program_wire.use()
+            self.shader_program_wire.set_vec3("wire_color", self.wire_color)
+            self.shader_program.use()
+            set_material_uniforms(self.shader_program, self.material_data, self.color)
+            glLineWidth(2)
+
+        self.update_instances(vehicle_base.model, camera.frustum)
+        self.draw_batches()
+
+class WarningPanel:
+    def __init__(self, width=140, height=140):
+
+        self.shader_program = None
+        self.vertex_count = 0
+        self.width = width
+        self.height = height
+
+    def init_object(self, shader_cache: ShaderCache) -> None:
+
+        source_vertex = """
+        #version 330 core
+        """ + SOURCE_FRAME_DATA + """
+        layout (location = 0) in vec3 v_pos;
+        layout (location = 1) in vec3 v_color;
+        out vec3 color;
+ 
+        uniform mat4 model;
+
+        void main() {
+          gl_Position = projection * view * model * vec4(v_pos, 1.0f);
+          color = v_color;
+        }
+        """
+
+        source_fragment = """
+        #version 330 core
+        in vec3 color;
+        out vec4 FragColor;
+        void main() {
+          FragColor = vec4(color.x, color.y, color.z, 0.5f);
+        }
+        """
+
+        # ------------------------------------------------------------
+        # compilation
+        # ------------------------------------------------------------
+
+        self.shader_program = shader_cache.get(source_vertex, source_fragment)
+
+        half_width = self.width / 2.0
+        half_height = self.height / 2.0
+        vertices = [
+            [-half_width, -half_height, 0.0],
+            [half_width, -half_height, 0.0],
+            [half_width, half_height, 0.0],
+
+            [-half_width, -half_height, 0.0],
+            [half_width, half_height, 0.0],
+            [-half_width, half_height, 0.0],
+        ]
+
+        color = [189/255, 0, 0]
+        colors = [color] * 6
+
+        vertices = np.array(vertices, dtype=np.float32)
+        colors = np.array(colors, dtype=np.float32)
+
+        # ----------------- vao ----------------- #
+        self.VAO = glGenVertexArrays(1)
+        glBindVertexArray(self.VAO)
+        # --------------- position --------------- #
+        vbo_position = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo_position)
+        glBufferData(GL_ARRAY_BUFFER, vertices.flatten(), GL_STATIC_DRAW)
+        glVertexAttribPointer(0, 3, GL_FLOAT, False, 0, ctypes.c_void_p(0)) # position
+        glEnableVertexAttribArray(0)
+        # ---------------- color ---------------- #
+        vbo_colors = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo_colors)
+        glBufferData(GL_ARRAY_BUFFER, colors.flatten(), GL_STATIC_DRAW)
+        glVertexAttribPointer(1, 3, GL_FLOAT, False, 0, ctypes.c_void_p(0)) # color
+        glEnableVertexAttribArray(1)
+
+        self.vertex_count = len(vertices)
+
+    def draw_object(self, camera: Camera, vehicle_base: VehicleBase, side:str, show:bool) -> None:
+
+        if self.shader_program == None:
+            return
+
+        if not show:
+            return
+        
+        self.shader_program.use()
+
+        model = vehicle_base.model
+
+        offset_north_south = 190
+        offset_east_west = 170
+        
+        if side == "north":
+            model = glm.translate(model, glm.vec3(0.0, 7.0, -offset_north_south))
+        elif side == "south":
+            model = glm.translate(model, glm.vec3(0.0, 7.0, offset_north_south))
+        elif side == "east":
+            model = glm.translate(model, glm.vec3(offset_east_west, 7.0, 0.0))
+            model = glm.rotate(model, -glm.pi()/2, glm.vec3(0.0, 1.0, 0.0))
+        elif side == "west":
+            model = glm.translate(model, glm.vec3(-offset_east_west, 7.0, 0.0))
+            model = glm.rotate(model, -glm.pi()/2, glm.vec3(0.0, 1.0, 0.0))
+
+        self.shader_program.set_mat4("model", model)
+        
+        glBindVertexArray(self.VAO)
+        glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
+
+def ring_ranges(first: int, n: int, size: int):
+    # (firsts, counts) that draw n points of a ring buffer vbo as one strip,
+    # starting at point `first`. slot `size` mirrors slot 0
+    slot = first % size
+    if slot + n <= size:
+        return [slot], [n]
+    return [slot, 0], [size + 1 - slot, n - (size - slot)]
+
+class PathTracer:
+    def __init__(self, max_points=2000, levels=1, stride=4):
+        self.shader_program = None
+        self.model = glm.mat4(1.0)
+        self.max_points = max_points
+        self.levels = levels
+        self.stride = stride
+        # camera distance at which the path switches to the next coarser level
+        self.lod_distance = 500.0
+        self.VAOs = []
+        self.VBOs = []
+        # one vbo per level of VehicleState, each a ring: point i lives in slot
+        # i % max_points. one extra slot mirrors slot 0 so the strip stays
+        # connected across the wrap
+        self.point_counts = [0] * levels
+        self.last_point = None
+
+    def init_object(self, shader_cache: ShaderCache) -> None:
+
+        source_vertex = """
+        #version 330 core
+        """ + SOURCE_FRAME_DATA + """
+        layout (location = 0) in vec3 v_pos;
+ 
+        uniform mat4 model;
+
+        void main() {
+          gl_Position = projection * view * model * vec4(v_pos, 1.0f);
+        }
+        """
+
+        source_fragment = """
+        #version 330 core
+        out vec4 FragColor;
+        void main() {
+          //FragColor = vec4(58.0/255, 134.0/255.0, 183.0/255.0, 0.7f);
+          FragColor = vec4(0.0f, 0.0f, 0.2f, 0.6f);
+        }
+        """
+
+        # ------------------------------------------------------------
+        # compilation
+        # ------------------------------------------------------------
+
+        self.shader_program = shader_cache.get(source_vertex, source_fragment)
+
+        for level in range(self.levels):
+            vao = glGenVertexArrays(1)
+            glBindVertexArray(vao)
+
+            vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, (self.max_points + 1) * 3 * 4, None, GL_DYNAMIC_DRAW)
+            glVertexAttribPointer(0, 3, GL_FLOAT, False, 0, ctypes.c_void_p(0))
+            glEnableVertexAttribArray(0)
+
+            self.VAOs.append(vao)
+            self.VBOs.append(vbo)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
+
+    def release_object(self) -> None:
+        glDeleteBuffers(len(self.VBOs), self.VBOs)
+        glDeleteVertexArrays(len(self.VAOs), self.VAOs)
+        self.VAOs = []
+        self.VBOs = []
+
+    def update(self, vehicle_state: VehicleState) -> None:
+        # upload only the points added since the last frame, level by level
+        for level in range(self.levels):
+            first, points = vehicle_state.positions_since(self.point_counts[level], level)
+            if len(points) == 0:
+                continue
+            if level == 0:
+                self.last_point = glm.vec3(*points[-1].tolist())
+            self.upload(level, first, points)
+
+    def upload(self, level: int, first: int, points: np.ndarray) -> None:
+        point_size = 3 * 4
+        slot = first % self.max_points
+        head = min(len(points), self.max_points - slot)
+        glBindBuffer(GL_ARRAY_BUFFER, self.VBOs[level])
+        glBufferSubData(GL_ARRAY_BUFFER, slot * point_size, head * point_size, points[:head])
+        if head < len(points):
+            glBufferSubData(GL_ARRAY_BUFFER, 0, (len(points) - head) * point_size, points[head:])
+        # keep the mirror of slot 0 up to date
+        if slot == 0:
+            glBufferSubData(GL_ARRAY_BUFFER, self.max_points * point_size, point_size, points[0])
+        elif head < len(points):
+            glBufferSubData(GL_ARRAY_BUFFER, self.max_points * point_size, point_size, points[head])
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.point_counts[level] = first + len(points)
+
+    def select_lod(self, camera: Camera) -> int:
+        # one level coarser every time the distance to the rover grows by stride
+        if self.last_point is None:
+            return 0
+        distance = glm.distance(camera.position, self.last_point)
+        lod = 0
+        while lod < self.levels - 1 and distance > self.lod_distance * self.stride ** lod:
+            lod += 1
+        return lod
+
+    def draw_object(self, camera: Camera) -> None:
+
+        if self.shader_program == None:
+            return
+
+        self.shader_program.use()
+        self.shader_program.set_mat4("model", self.model)
+        
+        glLineWidth(3)
+        # recent history at the selected level, older history from coarser
+        # levels, so the vertex count stays bounded by levels * max_points
+        lod = self.select_lod(camera)
+        for level, first, n in lod_windows(self.point_counts, self.max_points, self.stride, lod):
+            firsts, counts = ring_ranges(first, n, self.max_points)
+            glBindVertexArray(self.VAOs[level])
+            if len(firsts) == 1:
+                glDrawArrays(GL_LINE_STRIP, firsts[0], counts[0])
+            else:
+                glMultiDrawArrays(GL_LINE_STRIP, np.array(firsts, dtype=np.int32), np.array(counts, dtype=np.int32), len(firsts))
+
+class SkySphere:
+    def __init__(self):
+
+        self.shader_program = None
+        self.mesh = None
+        self.color = [0.7, 0.7, 0.7]
+
+    def init_object(self, mesh_registry: MeshRegistry, shader_cache: ShaderCache) -> None:
+
+        source_vertex = """
+        #version 330 core
+        """ + SOURCE_FRAME_DATA + """
+        layout (location = 0) in vec3 v_pos;
+        out vec3 color;
+ 
+        uniform mat4 model;
+        uniform vec3 object_color;
+
+        void main() {
+          gl_Position = projection * view * model * vec4(v_pos, 1.0f);
+          color = object_color;
+        }
+        """
+
+        source_fragment = """
+        #version 330 core
+        in vec3 color;
+        out vec4 FragColor;
+        void main() {
+          FragColor = vec4(color.x, color.y, color.z, 0.5f);
+        }
+        """
+
+        # ------------------------------------------------------------
+        # compilation
+        # ------------------------------------------------------------
+
+        self.shader_program = shader_cache.get(source_vertex, source_fragment)
+
+        self.mesh = mesh_registry.acquire("digital_twin/objects/sphere.obj")
+
+    def release_object(self, mesh_registry: MeshRegistry) -> None:
+        mesh_registry.release(self.mesh)
+
+    def draw_object(self, camera: Camera, show:bool=True) -> None:
+
+        if not show:
+            return
+        
+        self.shader_program.use()
+
+        model = glm.mat4(1.0)
+        # set position to be the same as camera
+        model[3][0] = camera.position.x
+        model[3][1] = camera.position.y
+        model[3][2] = camera.position.z
+
+        scale = 1000.0
+        model = glm.scale(model, glm.vec3(scale, scale, scale))
+
+        self.shader_program.set_mat4("model", model)
+        self.shader_program.set_vec3("object_color", self.color)
+        
+        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+        glLineWidth(4)
+        self.mesh.draw()
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+
+class Scene:
+    # the twin's gl objects and the per-frame work on them, shared by
+    # PanelView and the offscreen renderer. init_gl, render and release
+    # need the gl context current
+    def __init__(self, vehicle_state: VehicleState):
+        self.vehicle_state = vehicle_state
+        self.mesh_registry = MeshRegistry()
+        self.shader_cache = ShaderCache()
+        self.camera = Camera()
+        self.show_warning_panels = True
+        self.init = False
+
+        self.light_directional = {
+            "direction": [0.0, -1, 0.0],
+            "ambient": [0.2, 0.2, 0.2],
+            "diffuse": [0.7, 0.7, 0.7],
+            "specular": [1.0, 1.0, 1.0]
+        }
+
+    def init_gl(self) -> None:
+        if self.init:
+            return
+        glClearColor(0.8, 0.8, 0.8, 1.0)
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        #glClearDepth(1.0)
+        #glDepthMask(GL_TRUE)
+        #glDepthFunc(GL_LESS)
+        #glDepthRange(0.0, 1.0)
+
+        self.frame_uniforms = FrameUniformBuffer()
+
+        self.sky_sphere = SkySphere()
+        self.sky_sphere.init_object(self.mesh_registry, self.shader_cache)
+
+        self.vehicle_base = VehicleBase()
+        self.vehicle_base.init_object(self.mesh_registry, self.shader_cache)
+
+        self.vehicle_arm = VehicleArm()
+        self.vehicle_arm.init_object(self.mesh_registry, self.shader_cache)
+
+        self.path_tracer = PathTracer(self.vehicle_state.max_points, self.vehicle_state.levels, self.vehicle_state.stride)
+        self.path_tracer.init_object(self.shader_cache)
+
+        self.warning_panel_north = WarningPanel()
+        self.warning_panel_north.init_object(self.shader_cache)
+
+        self.warning_panel_south = WarningPanel()
+        self.warning_panel_south.init_object(self.shader_cache)
+
+        self.warning_panel_east = WarningPanel(width=200)
+        self.warning_panel_east.init_object(self.shader_cache)
+
+        self.warning_panel_west = WarningPanel(width=200)
+        self.warning_panel_west.init_object(self.shader_cache)
+
+        # one frame, in order. named so the frame can be timed step by step
+        self.passes = [
+            ("frame_uniforms", self.update_frame_uniforms),
+            ("vehicle_state", self.update_vehicle_state),
+            ("sky_sphere", lambda: self.sky_sphere.draw_object(self.camera)),
+            ("vehicle_base", lambda: self.vehicle_base.draw_object(self.camera)),
+            ("vehicle_arm", lambda: self.vehicle_arm.draw_object(self.camera, self.vehicle_base)),
+            ("path_tracer", lambda: self.path_tracer.draw_object(self.camera)),
+            ("warning_panels", self.draw_warning_panels),
+        ]
+        self.init = True
+
+    def release(self) -> None:
+        if not self.init:
+            return
+        self.sky_sphere.release_object(self.mesh_registry)
+        self.vehicle_base.release_object(self.mesh_registry)
+        self.vehicle_arm.release_object(self.mesh_registry)
+        self.path_tracer.release_object()
+        self.shader_cache.clear()
+        self.frame_uniforms.delete()
+        self.init = False
+
+    def set_viewport(self, width: int, height: int) -> None:
+        glViewport(0, 0, width, height)
+        self.camera.viewport_height = height
+        self.camera.projection = glm.perspective(glm.radians(self.camera.fov), width / max(height, 1), self.camera.near, self.camera.far)
+
+    def update_frame_uniforms(self) -> None:
+        # camera and light state for every program, uploaded once per frame
+        view = glm.lookAt(self.camera.position, self.camera.position + self.camera.front, self.camera.up)
+        self.frame_uniforms.update(self.camera.projection, view, self.camera.position, self.light_directional)
+        self.camera.frustum.update(self.camera.projection, view, self.camera.viewport_height, self.camera.position)
+
+    def update_vehicle_state(self) -> None:
+        self.path_tracer.update(self.vehicle_state)
+        last_position = self.vehicle_state.last_position()
+        if last_position is not None:
+            self.vehicle_base.set_position(glm.vec3(*last_position))
+        joint_angles = self.vehicle_state.get_joint_angles(self.vehicle_arm.arm_id)
+        if joint_angles is not None and not self.vehicle_arm.animate:
+            self.vehicle_arm.set_joint_angles(joint_angles)
+
+    def draw_warning_panels(self) -> None:
+        show = self.show_warning_panels
+        self.warning_panel_north.draw_object(self.camera, self.vehicle_base, "north", show)
+        self.warning_panel_south.draw_object(self.camera, self.vehicle_base, "south", show)
+        self.warning_panel_east.draw_object(self.camera, self.vehicle_base, "east", show)
+        self.warning_panel_west.draw_object(self.camera, self.vehicle_base, "west", show)
+
+    def render(self, profiler=None) -> None:
+        # profiler is anything with run(name, step), a RenderProfiler or one
+        # of the offscreen renderer's pass hooks
+        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+        for name, step in self.passes:
+            if profiler is None:
+                step()
+            else:
+                profiler.run(name, step)
@@ -0,0 +1,129 @@
+# shaderprogram.py
+
+import glm
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileShader, compileProgram
+
+# ------------------------------------------------------------
+# per-frame uniform block
+# ------------------------------------------------------------
+
+# std140 layout: projection @0, view @64, view_pos @128,
+# light_directional @144 (four vec3 members padded to 16 bytes)
+SOURCE_FRAME_DATA = """
+struct LightDirectional {
+  vec3 direction;
+  vec3 ambient;
+  vec3 diffuse;
+  vec3 specular;
+};
+
+layout (std140) uniform FrameData {
+  mat4 projection;
+  mat4 view;
+  vec3 view_pos;
+  LightDirectional light_directional;
+};
+"""
+
+FRAME_DATA_BINDING = 0
+FRAME_DATA_SIZE = 208
+
+# uniform blocks are bound to these binding points when a program is linked
+UNIFORM_BLOCK_BINDINGS = {
+    "FrameData": FRAME_DATA_BINDING,
+}
+
+class FrameUniformBuffer:
+    # camera and light state, filled once per frame and shared by every program
+    def __init__(self):
+        self.ubo = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferData(GL_UNIFORM_BUFFER, FRAME_DATA_SIZE, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        glBindBufferBase(GL_UNIFORM_BUFFER, FRAME_DATA_BINDING, self.ubo)
+
+    def update(self, projection: glm.mat4, view: glm.mat4, view_pos: glm.vec3, light_directional: dict) -> None:
+        data = b"".join((
+            projection.to_bytes(),
+            view.to_bytes(),
+            glm.vec4(view_pos, 0.0).to_bytes(),
+            glm.vec4(*light_directional["direction"], 0.0).to_bytes(),
+            glm.vec4(*light_directional["ambient"], 0.0).to_bytes(),
+            glm.vec4(*light_directional["diffuse"], 0.0).to_bytes(),
+            glm.vec4(*light_directional["specular"], 0.0).to_bytes(),
+        ))
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, len(data), data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+    def delete(self) -> None:
+        glDeleteBuffers(1, [self.ubo])
+
+class ShaderProgram:
+    def __init__(self, source_vertex: str, source_fragment: str, source_geometry: str = None):
+        shaders = [compileShader(source_vertex, GL_VERTEX_SHADER)]
+        if source_geometry is not None:
+            shaders.append(compileShader(source_geometry, GL_GEOMETRY_SHADER))
+        shaders.append(compileShader(source_fragment, GL_FRAGMENT_SHADER))
+        self.program = compileProgram(*shaders)
+        for shader in shaders:
+            glDeleteShader(shader)
+
+        # look up every active uniform once at link time
+        self.uniforms = {}
+        for i in range(glGetProgramiv(self.program, GL_ACTIVE_UNIFORMS)):
+            name, size, uniform_type = glGetActiveUniform(self.program, i)
+            name = name.decode() if isinstance(name, bytes) else name
+            if name.endswith("[0]"):
+                name = name[:-3]
+            self.uniforms[name] = glGetUniformLocation(self.program, name)
+
+        for block_name, binding in UNIFORM_BLOCK_BINDINGS.items():
+            block_index = glGetUniformBlockIndex(self.program, block_name)
+            if block_index != GL_INVALID_INDEX:
+                glUniformBlockBinding(self.program, block_index, binding)
+
+    def use(self) -> None:
+        glUseProgram(self.program)
+
+    # uniforms optimized out by the driver get location -1, which gl ignores
+
+    def set_mat4(self, name: str, value: glm.mat4) -> None:
+        glUniformMatrix4fv(self.uniforms.get(name, -1), 1, GL_FALSE, glm.value_ptr(value))
+
+    def set_vec2(self, name: str, value) -> None:
+        glUniform2f(self.uniforms.get(name, -1), value[0], value[1])
+
+    def set_vec3(self, name: str, value) -> None:
+        glUniform3f(self.uniforms.get(name, -1), value[0], value[1], value[2])
+
+    def set_float(self, name: str, value: float) -> None:
+        glUniform1f(self.uniforms.get(name, -1), value)
+
+    def set_int(self, name: str, value: int) -> None:
+        glUniform1i(self.uniforms.get(name, -1), value)
+
+    def set_bool(self, name: str, value: bool) -> None:
+        glUniform1i(self.uniforms.get(name, -1), int(value))
+
+    def delete(self) -> None:
+        glDeleteProgram(self.program)
+
+class ShaderCache:
+    # one linked program per unique (vertex, fragment, geometry) source set
+    def __init__(self):
+        self.programs = {}
+
+    def get(self, source_vertex: str, source_fragment: str, source_geometry: str = None) -> ShaderProgram:
+        key = (source_vertex, source_fragment, source_geometry)
+        program = self.programs.get(key)
+        if program is None:
+            program = ShaderProgram(source_vertex, source_fragment, source_geometry)
+            self.programs[key] = program
+        return program
+
+    def clear(self) -> None:
+        for program in self.programs.values():
+            program.delete()
+        self.programs = {}
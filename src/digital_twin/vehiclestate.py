@@ -1,13 +1,145 @@
 # vehiclestate.py
 
-from typing import Tuple
+import time
+import threading
+import numpy as np
+from typing import Tuple, Callable
+
+def lod_windows(counts, max_points:int, stride:int, lod:int=0):
+    # which part of every level to draw so the levels chain into one path:
+    # level lod is drawn whole and every coarser level only covers the history
+    # older than the finer level before it. returns [(level, first, n)] with
+    # first/n counted in points of that level
+    windows = []
+    for level in range(lod, len(counts)):
+        count = counts[level]
+        first = max(count - max_points, 0)
+        end = count
+        if level > lod:
+            # first point of this level at or after the oldest finer point,
+            # included so the two strips join
+            covered = windows[-1][1] * stride ** (level - 1)
+            end = min(-(-covered // stride ** level) + 1, count)
+        if end > first:
+            windows.append((level, first, end - first))
+        if first == 0:
+            break
+    return windows
 
 class VehicleState:
-    def __init__(self):
-        self.path_points = []
-        self.max_points = 2000
-
-    def add_position(self, new_position:Tuple[float, float, float]):
-        if len(self.path_points) > self.max_points - 1: # use queue
-            self.path_points.pop(0)
-        self.path_points.append(list(new_position))
\ No newline at end of file
+    def __init__(self, max_points:int=2000, levels:int=1, stride:int=4):
+        self.max_points = max_points
+        self.levels = levels
+        self.stride = stride
+        self.listeners = []
+        self.lock = threading.Lock()
+
+        # every point is written twice (at i and i + max_points) so the
+        # latest n points are always one contiguous slice, no copy needed
+        self._positions = np.zeros((2 * max_points, 3), dtype=np.float32)
+        self._timestamps = np.zeros(2 * max_points, dtype=np.float64)
+        # total number of points ever added, the write cursor is count % max_points
+        self.count = 0
+
+        # decimated history: level k keeps every stride**k-th point in a ring
+        # of the same size, so it reaches max_points * stride**k points back.
+        # level 0 is the full resolution ring above
+        self._level_positions = [self._positions] + [np.zeros((2 * max_points, 3), dtype=np.float32) for _ in range(1, levels)]
+        self.level_counts = [0] * levels
+
+        # latest joint angles of every arm (rocky/arm/<id>), in radians
+        self.joint_angles = {}
+
+    def add_listener(self, callback:Callable[[], None]):
+        # called after every update, possibly from the mqtt thread
+        self.listeners.append(callback)
+
+    def notify(self):
+        for callback in self.listeners:
+            callback()
+
+    def _append(self, new_position, timestamp:float):
+        # lock must be held
+        cursor = self.count % self.max_points
+        self._positions[cursor] = new_position
+        self._positions[cursor + self.max_points] = new_position
+        self._timestamps[cursor] = timestamp
+        self._timestamps[cursor + self.max_points] = timestamp
+        # point i goes to every level whose stride divides i
+        for level in range(1, self.levels):
+            if self.count % self.stride ** level != 0:
+                break
+            positions = self._level_positions[level]
+            cursor = self.level_counts[level] % self.max_points
+            positions[cursor] = new_position
+            positions[cursor + self.max_points] = new_position
+            self.level_counts[level] += 1
+        self.count += 1
+        self.level_counts[0] = self.count
+
+    def add_position(self, new_position:Tuple[float, float, float], timestamp:float=None):
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            self._append(new_position, timestamp)
+        self.notify()
+
+    def add_positions(self, new_positions, timestamps=None):
+        # a batch of points under one lock and one notification
+        if timestamps is None:
+            timestamps = [time.time()] * len(new_positions)
+        with self.lock:
+            for new_position, timestamp in zip(new_positions, timestamps):
+                self._append(new_position, timestamp)
+        self.notify()
+
+    def set_joint_angles(self, arm:int, angles):
+        angles = tuple(angles)
+        with self.lock:
+            if self.joint_angles.get(arm) == angles:
+                return
+            self.joint_angles[arm] = angles
+        self.notify()
+
+    def get_joint_angles(self, arm:int):
+        with self.lock:
+            return self.joint_angles.get(arm)
+
+    def __len__(self) -> int:
+        return min(self.count, self.max_points)
+
+    def _window(self, n:int) -> slice:
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.count % self.max_points + self.max_points if self.count >= self.max_points else self.count
+        return slice(end - n, end)
+
+    # the views below alias the ring buffer: they are not copies and later
+    # appends will overwrite them, copy if the data has to be kept
+
+    def latest_positions(self, n:int=None) -> np.ndarray:
+        with self.lock:
+            return self._positions[self._window(n)]
+
+    def latest_timestamps(self, n:int=None) -> np.ndarray:
+        with self.lock:
+            return self._timestamps[self._window(n)]
+
+    def positions_since(self, start:int, level:int=0):
+        # points of a level added after the first `start` ones, as
+        # (first index, view). points that already fell out of the ring are skipped
+        with self.lock:
+            count = self.level_counts[level]
+            start = max(start, count - self.max_points)
+            begin = start % self.max_points
+            return start, self._level_positions[level][begin:begin + count - start]
+
+    def last_position(self):
+        with self.lock:
+            if self.count == 0:
+                return None
+            return tuple(self._positions[(self.count - 1) % self.max_points].tolist())
+
+    @property
+    def path_points(self) -> np.ndarray:
+        return self.latest_positions()
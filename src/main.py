@@ -1,7 +1,8 @@
 # main.py
 
+import os
 import json
-import datetime
+import time
 import cv2
 import wx
 import wx.aui as aui
@@ -12,7 +13,10 @@ from digital_twin.view import PanelView
 from digital_twin.panelinfo import PanelInfo
 from digital_twin.vehiclestate import VehicleState
 from statusbar import CustomStatusBar
+from messagelog import MessageLog
 from mqtt.mqtt_handler import MQTTHandler
+from mqtt.recording import TelemetryRecording
+from mqtt.replay import TelemetryReplay
 
 import ctypes
 ctypes.windll.shcore.SetProcessDpiAwareness(1)
@@ -36,33 +40,52 @@ class FrameMain(wx.Frame):
         # 2 -> imu hand
         self.control_mode = 0
         self.connection_status = False
-        self.vehicle_state = VehicleState()
+
+        try:
+            with open("config.json", "r") as file:
+                self.config = json.load(file)
+        except (OSError, ValueError):
+            self.config = {}
+
+        self.vehicle_state = VehicleState(self.config.get("max_path_points", 2000), self.config.get("path_levels", 6))
 
         self._mgr = aui.AuiManager()
         self._mgr.SetManagedWindow(self)
         
-        self._panel_view = PanelView(self, self.vehicle_state)
+        self._panel_view = PanelView(self, self.vehicle_state, self.config.get("target_fps", 60))
         self._panel_info = PanelInfo(self)
         url = "http://172.20.10.11:81/stream"
         #self.capture = cv2.VideoCapture(0)
         #self.capture = cv2.VideoCapture(url)
         #self._panel_camera = PanelCamera(self, self.capture)
-        self._panel_camera = wx.Panel(self)
+        # "camera_source" (device index or stream url) turns the camera on,
+        # "camera_renderer": "gl" draws it with PanelCameraGL instead of bitmaps
+        camera_source = self.config.get("camera_source")
+        if camera_source is None:
+            self._panel_camera = wx.Panel(self)
+        else:
+            self.capture = cv2.VideoCapture(camera_source)
+            if self.config.get("camera_renderer", "bitmap") == "gl":
+                from vision.glcamera import PanelCameraGL
+                self._panel_camera = PanelCameraGL(self, self.capture)
+            else:
+                self._panel_camera = PanelCamera(self, self.capture)
 
         textctrl_font = wx.Font(10, wx.FONTFAMILY_MODERN, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL, False, "Courier")
 
-        self._textctrl_log = wx.TextCtrl(self, style=wx.TE_MULTILINE|wx.TE_READONLY|wx.NO_BORDER, size=wx.Size(-1, 90))
-        self._textctrl_log.SetFont(textctrl_font)
+        # bounded, virtual panes: memory and repaint cost don't grow with the session
+        self._messagelog_log = MessageLog(self, ("Time", "Level", "Message"), self.config.get("log_capacity", 10000))
+        self._messagelog_log.SetFont(textctrl_font)
         self.AddLogMessage("INFO", "Initialized.")
 
-        self._textctrl_mqtt = wx.TextCtrl(self, style=wx.TE_MULTILINE|wx.TE_READONLY|wx.NO_BORDER, size=wx.Size(-1, 90))
-        self._textctrl_mqtt.SetFont(textctrl_font)
+        self._messagelog_mqtt = MessageLog(self, ("Time", "Topic", "Message"), self.config.get("mqtt_log_capacity", 10000))
+        self._messagelog_mqtt.SetFont(textctrl_font)
 
         self._mgr.AddPane(self._panel_view, aui.AuiPaneInfo().Name("view").Top().CenterPane())
         self._mgr.AddPane(self._panel_info, aui.AuiPaneInfo().Name("info").Caption("Info").CloseButton(True))
         self._mgr.AddPane(self._panel_camera, aui.AuiPaneInfo().Name("camera").Caption("Camera footage").CloseButton(True))
-        self._mgr.AddPane(self._textctrl_log, aui.AuiPaneInfo().Name("textctrl_log").Caption("Log").CloseButton(False))
-        self._mgr.AddPane(self._textctrl_mqtt, aui.AuiPaneInfo().Name("textctrl_mqtt").Caption("MQTT").CloseButton(True))
+        self._mgr.AddPane(self._messagelog_log, aui.AuiPaneInfo().Name("textctrl_log").Caption("Log").CloseButton(False))
+        self._mgr.AddPane(self._messagelog_mqtt, aui.AuiPaneInfo().Name("textctrl_mqtt").Caption("MQTT").CloseButton(True))
 
         self._mgr.GetPane("view").Show().CenterPane()
         self._mgr.GetPane("camera").Show().Left().MinSize(wx.Size(300, 300))
@@ -109,6 +132,16 @@ class FrameMain(wx.Frame):
         # ----------------- view ----------------- #
 
         menu_view = wx.Menu()
+        item_mesh_registry = wx.MenuItem(menu_view, -1, "Dump mesh registry", "Write the GPU meshes currently resident to the log.")
+        item_profiler = wx.MenuItem(menu_view, -1, "Render &profiler", "Time every render pass and show the frame times in the status bar.", kind=wx.ITEM_CHECK)
+        item_profiler_export = wx.MenuItem(menu_view, -1, "Export render profile...", "Write the recorded frame times to a CSV or trace file.")
+        menu_view.Append(item_mesh_registry)
+        menu_view.AppendSeparator()
+        menu_view.Append(item_profiler)
+        menu_view.Append(item_profiler_export)
+        self.Bind(wx.EVT_MENU, self.OnDumpMeshRegistry, item_mesh_registry)
+        self.Bind(wx.EVT_MENU, self.OnProfiler, item_profiler)
+        self.Bind(wx.EVT_MENU, self.OnProfilerExport, item_profiler_export)
         """
         item_camera_footage = wx.MenuItem(menu_view, -1, "Show camera footage...", "Show Rocky's camera footage in an external window.")
         item_topics = wx.MenuItem(menu_view, -1, "Show MQTT messages...", "Show all messages on the server.")
@@ -119,10 +152,29 @@ class FrameMain(wx.Frame):
         self.Bind(wx.EVT_MENU, self.OnCamera, item_camera_footage)
         """
 
+        # -------------- telemetry -------------- #
+
+        menu_telemetry = wx.Menu()
+        item_record_start = wx.MenuItem(menu_telemetry, -1, "Start &recording", "Write every received message to a recording file.")
+        item_record_stop = wx.MenuItem(menu_telemetry, -1, "Stop recording", "Close the current recording.")
+        item_replay_start = wx.MenuItem(menu_telemetry, -1, "&Replay recording...", "Play back a recording without a broker.")
+        item_replay_stop = wx.MenuItem(menu_telemetry, -1, "Stop replay", "Stop the current replay.")
+        menu_telemetry.Append(item_record_start)
+        menu_telemetry.Append(item_record_stop)
+        menu_telemetry.AppendSeparator()
+        menu_telemetry.Append(item_replay_start)
+        menu_telemetry.Append(item_replay_stop)
+
+        self.Bind(wx.EVT_MENU, self.OnRecordStart, item_record_start)
+        self.Bind(wx.EVT_MENU, self.OnRecordStop, item_record_stop)
+        self.Bind(wx.EVT_MENU, self.OnReplayStart, item_replay_start)
+        self.Bind(wx.EVT_MENU, self.OnReplayStop, item_replay_stop)
+
         # ------------ setup menubar ------------ #
 
         menubar.Append(menu_configuration, "Configuration")
         menubar.Append(menu_view, "View")
+        menubar.Append(menu_telemetry, "Telemetry")
         
         self.SetMenuBar(menubar)
 
@@ -131,11 +183,17 @@ class FrameMain(wx.Frame):
         self.statusbar = CustomStatusBar(self)
         self.SetStatusBar(self.statusbar)
 
+        self.timer_profiler = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnProfilerTimer, self.timer_profiler)
+
         # ------------------------------------------------------------
         # mqtt
         # ------------------------------------------------------------
 
-        self.mqtt_handler = MQTTHandler(self._textctrl_mqtt, self.vehicle_state)
+        self.mqtt_handler = MQTTHandler(self._messagelog_mqtt, self.vehicle_state, self.config.get("target_fps", 60))
+        self.replay = None
+
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
 
     def OnConnect(self, event):
         with open("config.json", "r") as file:
@@ -174,12 +232,106 @@ class FrameMain(wx.Frame):
     def OnExit(self, event):
         self.Close()
 
+    def OnClose(self, event):
+        self.timer_profiler.Stop()
+        # flush the last chunk of an open recording
+        self.OnReplayStop(None)
+        self.mqtt_handler.stop_recording()
+        event.Skip()
+
     def OnCamera(self, event):
         pass
 
+    def OnDumpMeshRegistry(self, event):
+        self.AddLogMessage("DEBUG", "Mesh registry:\n" + self._panel_view.scene.mesh_registry.dump())
+
+    def OnProfiler(self, event):
+        enabled = event.IsChecked()
+        self._panel_view.enable_profiler(enabled, self.config.get("profiler_history", 600))
+        if enabled:
+            self.timer_profiler.Start(500)
+        else:
+            self.timer_profiler.Stop()
+            self.statusbar.SetSTRender("")
+
+    def OnProfilerTimer(self, event):
+        profiler = self._panel_view.profiler
+        if profiler is not None:
+            self.statusbar.SetSTRender(profiler.summary())
+
+    def OnProfilerExport(self, event):
+        profiler = self._panel_view.profiler
+        if profiler is None:
+            wx.MessageDialog(self, "Enable the render profiler first.", "Export render profile", style=wx.OK).ShowModal()
+            return
+        dlg = wx.FileDialog(self, "Export render profile", wildcard="CSV (*.csv)|*.csv|Trace (*.json)|*.json",
+                            style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+        path = dlg.GetPath()
+        try:
+            if dlg.GetFilterIndex() == 1:
+                profiler.export_trace(path)
+            else:
+                profiler.export_csv(path)
+        except OSError as e:
+            self.AddLogMessage("ERROR", f"Profiler: could not write {path}: {e}")
+            return
+        self.AddLogMessage("INFO", f"Profiler: {min(profiler.frame, profiler.history)} frames written to {path}.")
+
+    def OnRecordStart(self, event):
+        directory = self.config.get("recording_directory", "recordings")
+        path = os.path.join(directory, time.strftime("telemetry-%Y%m%d-%H%M%S.rec"))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.mqtt_handler.start_recording(path)
+        except OSError as e:
+            self.AddLogMessage("ERROR", f"Recording: could not create {path}: {e}")
+            return
+        self.AddLogMessage("INFO", f"Recording: writing to {path}.")
+
+    def OnRecordStop(self, event):
+        recorder = self.mqtt_handler.recorder
+        if recorder is None:
+            return
+        self.mqtt_handler.stop_recording()
+        self.AddLogMessage("INFO", f"Recording: {recorder.message_count} messages written to {recorder.path}.")
+
+    def OnReplayStart(self, event):
+        dlg = wx.FileDialog(self, "Replay recording", self.config.get("recording_directory", "recordings"),
+                            wildcard="Telemetry recordings (*.rec)|*.rec", style=wx.FD_OPEN|wx.FD_FILE_MUST_EXIST)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+        path = dlg.GetPath()
+        speeds = {"1x": 1.0, "2x": 2.0, "10x": 10.0, "100x": 100.0, "Max": 0.0}
+        dlg = wx.SingleChoiceDialog(self, "Replay speed:", "Replay recording", list(speeds))
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+        try:
+            recording = TelemetryRecording(path)
+        except (OSError, ValueError) as e:
+            self.AddLogMessage("ERROR", f"Replay: could not open {path}: {e}")
+            return
+        self.OnReplayStop(None)
+        self.replay = TelemetryReplay(recording, self.mqtt_handler.apply, speeds[dlg.GetStringSelection()])
+        self.replay.on_finished = self.OnReplayFinished
+        self.replay.start()
+        self.AddLogMessage("INFO", f"Replay: {recording.message_count} messages from {path} at {dlg.GetStringSelection()}.")
+
+    def OnReplayStop(self, event):
+        if self.replay is not None:
+            self.replay.stop()
+            # unmaps the chunks, windows keeps the file locked until then
+            self.replay.recording.close()
+            self.replay = None
+
+    def OnReplayFinished(self):
+        self.AddLogMessage("INFO", f"Replay: finished, {self.replay.replayed} messages.")
+        self.replay.recording.close()
+        self.replay = None
+
     def AddLogMessage(self, type: str, value:str):
-        message = f">> {datetime.datetime.now().strftime("%H:%M:%S")} [{type}] - {value}\n"
-        self._textctrl_log.AppendText(message)
+        self._messagelog_log.append(type, value)
 
 if __name__ == "__main__":
     app = wx.App()
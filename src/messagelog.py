@@ -0,0 +1,196 @@
+# messagelog.py
+
+import wx
+import time
+import datetime
+from utils import dip
+
+class MessageBuffer:
+    # fixed capacity ring of (timestamp, source, text) entries, entry i lives
+    # in slot i % capacity. memory stays constant however long the session runs
+    def __init__(self, capacity:int=10000):
+        self.capacity = capacity
+        self.entries = [None] * capacity
+        # total number of entries ever added
+        self.count = 0
+
+    def append(self, entry:tuple) -> None:
+        self.entries[self.count % self.capacity] = entry
+        self.count += 1
+
+    def first(self) -> int:
+        # index of the oldest entry still in the ring
+        return max(self.count - self.capacity, 0)
+
+    def get(self, index:int):
+        if index < self.first() or index >= self.count:
+            return None
+        return self.entries[index % self.capacity]
+
+    def clear(self) -> None:
+        self.entries = [None] * self.capacity
+        self.count = 0
+
+class MessageListCtrl(wx.ListCtrl):
+    # virtual list, only the rows on screen are ever formatted. rows map to
+    # a snapshot of the buffer taken at the last refresh
+    def __init__(self, parent, buffer:MessageBuffer, columns):
+        super().__init__(parent, style=wx.LC_REPORT|wx.LC_VIRTUAL|wx.NO_BORDER)
+        self.buffer = buffer
+        self.InsertColumn(0, columns[0], width=dip(70))
+        self.InsertColumn(1, columns[1], width=dip(110))
+        self.InsertColumn(2, columns[2], width=dip(300))
+
+        # absolute indices of the rows when filtered, None shows every entry
+        self.rows = None
+        self.shown_first = 0
+
+        self.Bind(wx.EVT_SIZE, self.OnSize)
+
+    def OnSize(self, event):
+        # last column takes the remaining width
+        width = self.GetClientSize().width - self.GetColumnWidth(0) - self.GetColumnWidth(1)
+        self.SetColumnWidth(2, max(width, dip(100)))
+        event.Skip()
+
+    def OnGetItemText(self, item:int, column:int) -> str:
+        index = self.rows[item] if self.rows is not None else self.shown_first + item
+        entry = self.buffer.get(index)
+        if entry is None:
+            return ""
+        timestamp, source, text = entry
+        if column == 0:
+            return datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+        if column == 1:
+            return source
+        if not isinstance(text, str):
+            # decoded binary telemetry, formatted only when it is on screen
+            return " ".join(f"{value:.4g}" for value in text)
+        return text
+
+class MessageLog(wx.Panel):
+    # bounded replacement for a read-only multiline TextCtrl: appends only
+    # touch the ring buffer, the list is refreshed on a timer
+    def __init__(self, parent, columns=("Time", "Topic", "Message"), capacity:int=10000, refresh_ms:int=100):
+        super().__init__(parent)
+
+        self.buffer = MessageBuffer(capacity)
+        self.dirty = False
+        self.topic_filter = ""
+        # absolute indices of the entries that match the filter, matches before
+        # matches_start were evicted from the ring and are skipped
+        self.matches = []
+        self.matches_start = 0
+        self.scanned = 0
+
+        self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.SetSizer(self.sizer)
+
+        # ---------------- toolbar ---------------- #
+
+        toolbar_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.textctrl_filter = wx.TextCtrl(self, size=wx.Size(dip(150), -1))
+        self.textctrl_filter.SetHint(f"{columns[1]} filter")
+        self.checkbox_pause = wx.CheckBox(self, label="Pause")
+        self.checkbox_follow = wx.CheckBox(self, label="Follow")
+        self.checkbox_follow.SetValue(True)
+        button_clear = wx.Button(self, label="Clear", style=wx.BU_EXACTFIT)
+        toolbar_sizer.Add(self.textctrl_filter, proportion=0, flag=wx.ALIGN_CENTER_VERTICAL|wx.RIGHT, border=dip(5))
+        toolbar_sizer.Add(self.checkbox_pause, proportion=0, flag=wx.ALIGN_CENTER_VERTICAL|wx.RIGHT, border=dip(5))
+        toolbar_sizer.Add(self.checkbox_follow, proportion=0, flag=wx.ALIGN_CENTER_VERTICAL|wx.RIGHT, border=dip(5))
+        toolbar_sizer.Add(button_clear, proportion=0, flag=wx.ALIGN_CENTER_VERTICAL)
+
+        self.textctrl_filter.Bind(wx.EVT_TEXT, self.OnFilter)
+        self.checkbox_pause.Bind(wx.EVT_CHECKBOX, self.OnPause)
+        self.checkbox_follow.Bind(wx.EVT_CHECKBOX, self.OnFollow)
+        button_clear.Bind(wx.EVT_BUTTON, self.OnClear)
+
+        # ----------------- list ----------------- #
+
+        self.listctrl = MessageListCtrl(self, self.buffer, columns)
+
+        self.sizer.Add(toolbar_sizer, proportion=0, flag=wx.EXPAND|wx.ALL, border=dip(2))
+        self.sizer.Add(self.listctrl, proportion=1, flag=wx.EXPAND)
+
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnTimer, self.timer)
+        self.timer.Start(refresh_ms)
+
+    def SetFont(self, font:wx.Font) -> bool:
+        return self.listctrl.SetFont(font)
+
+    def append(self, source:str, text, timestamp:float=None) -> None:
+        # gui thread only. multiline text becomes one row per line, text can
+        # also be a sequence of numbers
+        if timestamp is None:
+            timestamp = time.time()
+        if not isinstance(text, str):
+            self.buffer.append((timestamp, source, text))
+        else:
+            for line in text.splitlines() or [""]:
+                self.buffer.append((timestamp, source, line))
+        self.dirty = True
+
+    def extend(self, entries) -> None:
+        # gui thread only, (timestamp, source, text) entries
+        for timestamp, source, text in entries:
+            self.append(source, text, timestamp)
+
+    def scan_matches(self) -> None:
+        # only entries added since the last refresh are tested
+        first = self.buffer.first()
+        for index in range(max(self.scanned, first), self.buffer.count):
+            if self.topic_filter in self.buffer.get(index)[1].lower():
+                self.matches.append(index)
+        self.scanned = self.buffer.count
+        while self.matches_start < len(self.matches) and self.matches[self.matches_start] < first:
+            self.matches_start += 1
+        # drop evicted matches once they are half of the list
+        if self.matches_start > len(self.matches) // 2:
+            del self.matches[:self.matches_start]
+            self.matches_start = 0
+
+    def refresh(self) -> None:
+        self.dirty = False
+        if self.topic_filter:
+            self.scan_matches()
+            self.listctrl.rows = self.matches[self.matches_start:]
+            count = len(self.listctrl.rows)
+        else:
+            self.listctrl.rows = None
+            self.listctrl.shown_first = self.buffer.first()
+            count = self.buffer.count - self.listctrl.shown_first
+        self.listctrl.SetItemCount(count)
+        if count == 0:
+            return
+        if self.checkbox_follow.GetValue():
+            self.listctrl.EnsureVisible(count - 1)
+        # rows shift when the ring evicts, redraw the visible ones
+        top = self.listctrl.GetTopItem()
+        self.listctrl.RefreshItems(top, min(top + self.listctrl.GetCountPerPage(), count - 1))
+
+    def OnTimer(self, event:wx.TimerEvent):
+        if self.dirty and not self.checkbox_pause.GetValue():
+            self.refresh()
+
+    def OnFilter(self, event):
+        self.topic_filter = self.textctrl_filter.GetValue().strip().lower()
+        self.matches = []
+        self.matches_start = 0
+        self.scanned = 0
+        self.refresh()
+
+    def OnPause(self, event):
+        if not self.checkbox_pause.GetValue():
+            self.refresh()
+
+    def OnFollow(self, event):
+        if self.checkbox_follow.GetValue():
+            self.refresh()
+
+    def OnClear(self, event):
+        self.buffer.clear()
+        self.matches = []
+        self.matches_start = 0
+        self.scanned = 0
+        self.refresh()
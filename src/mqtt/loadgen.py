@@ -0,0 +1,110 @@
+# loadgen.py
+#
+# synthetic rocky telemetry at a fixed rate, text or binary payloads.
+# against a broker, run from src/:
+#   python -m mqtt.loadgen --host 127.0.0.1 --rate 200 --duration 60 --format binary
+
+import sys
+import time
+import argparse
+from math import sin, cos
+from mqtt.telemetryformat import TOPIC_FORMATS, encode
+
+DEFAULT_TOPICS = ("rocky/position", "rocky/arm/1", "rocky/arm/2", "rocky/imu")
+
+class LoadGenerator:
+    # publish(topic, payload) is called for every message, rate is the
+    # number of messages per second of every topic. with tag_sequence the
+    # position x is the message sequence number, so a receiver can match
+    # every position to its send time in send_times. binary payloads also
+    # carry the send timestamp, text ones only the values (the receiver
+    # parses them strictly), their latency goes by the sequence tag.
+    # positions are float32 downstream, tags are exact up to 2**24
+    def __init__(self, publish, rate:float=50.0, topics=DEFAULT_TOPICS, payload_format:str="text", tag_sequence:bool=False):
+        self.publish = publish
+        self.rate = rate
+        self.topics = topics
+        self.payload_format = payload_format
+        self.tag_sequence = tag_sequence
+        self.sequence = 0
+        self.send_times = []
+        self.running = False
+
+    def values(self, topic:str, sequence:int, t:float):
+        if topic == "rocky/position":
+            x = float(sequence) if self.tag_sequence else 200 * cos(t * 0.2)
+            return (x, 0.0, 200 * sin(t * 0.2))
+        if topic.startswith("rocky/arm/"):
+            return (sin(t), sin(t * 0.7), cos(t) * 2)
+        if topic == "rocky/imu":
+            return (0.1 * sin(t * 5), 0.1 * cos(t * 5), 9.81, 0.0, 0.0, 0.2 * sin(t))
+        return ()
+
+    def payload(self, topic:str, values, sequence:int, timestamp:float) -> bytes:
+        if self.payload_format == "binary" and topic in TOPIC_FORMATS:
+            return encode(topic, values, sequence, timestamp)
+        # repr round-trips exactly, sequence tags stay exact integers
+        return " ".join(repr(float(value)) for value in values).encode()
+
+    def send(self, t:float) -> None:
+        sequence = self.sequence
+        timestamp = time.time()
+        self.send_times.append(time.perf_counter())
+        for topic in self.topics:
+            values = self.values(topic, sequence, t)
+            self.publish(topic, self.payload(topic, values, sequence, timestamp))
+        self.sequence += 1
+
+    def run(self, duration:float) -> int:
+        # paced in bursts so high rates don't depend on sleep resolution.
+        # returns the number of sequences sent
+        self.running = True
+        start = time.perf_counter()
+        sent = 0
+        while self.running:
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration:
+                break
+            due = int(elapsed * self.rate) + 1
+            while sent < due:
+                self.send(elapsed)
+                sent += 1
+            time.sleep(min(0.001, 1.0 / self.rate))
+        self.running = False
+        return sent
+
+    def stop(self) -> None:
+        self.running = False
+
+def main():
+    import paho.mqtt.client as mqtt
+
+    parser = argparse.ArgumentParser(description="publish synthetic rocky telemetry")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--rate", type=float, default=50.0, help="messages per second and topic")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--format", choices=("text", "binary"), default="text")
+    parser.add_argument("--topics", nargs="+", default=list(DEFAULT_TOPICS))
+    args = parser.parse_args()
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    try:
+        client.connect(args.host, args.port, 60)
+    except Exception as e:
+        print(f"could not connect to {args.host}:{args.port}: {e}")
+        sys.exit(1)
+    client.loop_start()
+    generator = LoadGenerator(lambda topic, payload: client.publish(topic, payload), args.rate, args.topics, args.format)
+    start = time.perf_counter()
+    try:
+        sent = generator.run(args.duration)
+    except KeyboardInterrupt:
+        sent = generator.sequence
+    elapsed = time.perf_counter() - start
+    client.loop_stop()
+    client.disconnect()
+    print(f"sent {sent * len(args.topics)} messages in {elapsed:.1f} s ({sent / elapsed:.0f}/s per topic, {args.format})")
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,36 @@
 
 import paho.mqtt.client as mqtt
 from digital_twin.vehiclestate import VehicleState
+from mqtt.telemetryqueue import TelemetryQueue
+from mqtt.telemetryformat import parse_message, decode_binary
+from mqtt.recording import TelemetryRecorder
+from messagelog import MessageLog
 import threading
+import time
 import wx
 
 class MQTTHandler:
-    def __init__(self, textctrl:wx.TextCtrl, vehicle_state: VehicleState):
+    def __init__(self, message_log:MessageLog, vehicle_state: VehicleState, target_fps:float=60.0):
         self.broker_address = None
         self.port = 1883
         self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
-        self.textctrl = textctrl
+        self.message_log = message_log
         self.vehicle_state = vehicle_state
-        self.topics = ["rocky/position", "rocky/arm/1", "rocky/arm/2"]
+        self.topics = ["rocky/position", "rocky/arm/1", "rocky/arm/2", "rocky/imu"]
+
+        # messages are parsed on the network thread and applied on the gui
+        # thread in batches, at most once per frame
+        self.queue = TelemetryQueue()
+        self.drain_interval = 1.0 / target_fps
+        self.drain_pending = False
+        self.last_drain_time = 0.0
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+
+        # every applied message is also written here while recording
+        self.recorder = None
 
     def on_connect(self, client:mqtt.Client, userdata, flags, reason_code, properties):
         client.subscribe([(topic, 0) for topic in self.topics])
@@ -22,16 +39,78 @@ class MQTTHandler:
         #client.publish("rocky/position", "Interface connected222.")
     
     def on_message(self, client, userdata, msg):
-        # get message data
-        topic = msg.topic
-        message = msg.payload.decode("utf-8")
-        # add message to mqtt log
-        self.textctrl.AppendText(f"{topic} {message}\n")
+        # network thread: parse, queue and wake the gui, never touch wx here
+        self.queue.push(parse_message(msg.topic, msg.payload))
+        self.request_drain()
+
+    # ------------------------------------------------------------
+    # gui side
+    # ------------------------------------------------------------
+
+    def request_drain(self):
+        # any thread, bursts collapse into one CallAfter
+        if self.drain_pending:
+            return
+        self.drain_pending = True
+        wx.CallAfter(self._schedule_drain)
+
+    def _schedule_drain(self):
+        wait = self.last_drain_time + self.drain_interval - time.perf_counter()
+        if wait <= 0:
+            self.drain()
+        else:
+            self.timer.StartOnce(max(1, int(wait * 1000)))
+
+    def OnTimer(self, event:wx.TimerEvent):
+        self.drain()
+
+    def drain(self):
+        # clear the flag before popping so a message pushed meanwhile
+        # schedules the next drain
+        self.drain_pending = False
+        self.last_drain_time = time.perf_counter()
+        batch = self.queue.pop_all()
+        if batch:
+            self.apply(batch)
+
+    def apply(self, batch:list):
+        batch = decode_binary(batch)
+        if self.recorder is not None:
+            self.recorder.record(batch)
+        # add messages to mqtt log, the panel may be gone (destroyed widgets are falsy)
+        if self.message_log:
+            self.message_log.extend((timestamp, topic, text) for timestamp, topic, text, values in batch)
         # update vehicle state with data
-        if topic == "rocky/position":
-            x, y, z = message.split(' ')
-            x, y, z = float(x), float(y), float(z)
-            self.vehicle_state.add_position([x, y, z])
+        positions = []
+        timestamps = []
+        joint_angles = {}
+        for timestamp, topic, text, values in batch:
+            if values is None:
+                continue
+            if topic == "rocky/position" and len(values) == 3:
+                positions.append(values)
+                timestamps.append(timestamp)
+            elif topic.startswith("rocky/arm/"):
+                # only the latest pose of every arm in the batch matters
+                try:
+                    joint_angles[int(topic.rsplit("/", 1)[1])] = values
+                except ValueError:
+                    pass
+        if positions:
+            self.vehicle_state.add_positions(positions, timestamps)
+        for arm, angles in joint_angles.items():
+            self.vehicle_state.set_joint_angles(arm, angles)
+
+    def start_recording(self, path:str):
+        self.stop_recording()
+        self.recorder = TelemetryRecorder(path)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            # messages that arrived since the last drain belong to the recording
+            self.drain()
+            self.recorder.close()
+            self.recorder = None
 
     def SetBrokerAddress(self, value:str):
         self.broker_address = value
@@ -53,3 +132,5 @@ class MQTTHandler:
     def disconnect(self):
         self.client.disconnect()
         self.thread.join(timeout=1.0)
+        self.timer.Stop()
+        self.drain()
@@ -0,0 +1,212 @@
+# recording.py
+
+import os
+import json
+import mmap
+import struct
+import numpy as np
+
+# append-only telemetry recording. the file is a header followed by chunks,
+# every chunk is self-describing (its own topic table) and stores its
+# messages column by column:
+#
+#   chunk header | topics json | timestamps f8[n] | values f4[n, 6] | topic ids u2[n] | counts u1[n]
+#
+# a small json index next to the file lists the chunk offsets so a
+# recording can be opened without scanning it. the index is only a cache,
+# it is rebuilt from the chunk headers when missing or behind
+
+FILE_MAGIC = b"RKYTELEM"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<8sI4x")
+
+CHUNK_MAGIC = b"CHNK"
+# magic, message count, first timestamp, last timestamp, topics json size
+CHUNK_HEADER = struct.Struct("<4sIddI4x")
+
+# widest decoded message (rocky/imu), shorter ones are nan padded
+MAX_VALUES = 6
+
+def _padded(n: int) -> int:
+    # keep every column 8-byte aligned
+    return (n + 7) & ~7
+
+def _chunk_nbytes(count: int, topics_nbytes: int) -> int:
+    columns = count * (8 + MAX_VALUES * 4 + 2 + 1)
+    return CHUNK_HEADER.size + _padded(topics_nbytes) + _padded(columns)
+
+def index_path(path: str) -> str:
+    return path + ".idx.json"
+
+class TelemetryRecorder:
+    # buffers decoded messages into preallocated columns and writes one chunk
+    # every chunk_size messages. gui thread only, like MQTTHandler.apply
+    def __init__(self, path: str, chunk_size: int = 4096):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+        self.offset = FILE_HEADER.size
+        self.chunks = []
+        self.message_count = 0
+
+        self.timestamps = np.empty(chunk_size, dtype=np.float64)
+        self.values = np.full((chunk_size, MAX_VALUES), np.nan, dtype=np.float32)
+        self.topic_ids = np.empty(chunk_size, dtype=np.uint16)
+        self.counts = np.empty(chunk_size, dtype=np.uint8)
+        self.topics = {}
+        self.n = 0
+
+    def record(self, batch: list) -> None:
+        # (timestamp, topic, text, values) entries as produced by decode_binary
+        for timestamp, topic, text, values in batch:
+            i = self.n
+            self.timestamps[i] = timestamp
+            topic_id = self.topics.get(topic)
+            if topic_id is None:
+                topic_id = self.topics[topic] = len(self.topics)
+            self.topic_ids[i] = topic_id
+            if values is None:
+                self.counts[i] = 0
+            else:
+                k = min(len(values), MAX_VALUES)
+                self.values[i, :k] = values[:k]
+                self.counts[i] = k
+            self.n += 1
+            if self.n == self.chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        n = self.n
+        if n == 0:
+            return
+        topics = json.dumps(list(self.topics)).encode()
+        columns = b"".join((
+            self.timestamps[:n].tobytes(),
+            self.values[:n].tobytes(),
+            self.topic_ids[:n].tobytes(),
+            self.counts[:n].tobytes(),
+        ))
+        first, last = float(self.timestamps[0]), float(self.timestamps[n - 1])
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, first, last, len(topics)))
+        self.file.write(topics.ljust(_padded(len(topics)), b" "))
+        self.file.write(columns.ljust(_padded(len(columns)), b"\0"))
+        self.file.flush()
+
+        self.chunks.append([self.offset, n, first, last])
+        self.offset += _chunk_nbytes(n, len(topics))
+        self.message_count += n
+        self.write_index()
+
+        self.values[:n] = np.nan
+        self.topics = {}
+        self.n = 0
+
+    def write_index(self) -> None:
+        index = {"version": FILE_VERSION, "size": self.offset, "chunks": self.chunks}
+        tmp_path = index_path(self.path) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path(self.path))
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
+
+class Chunk:
+    # column views into the memory map, nothing is copied
+    def __init__(self, buffer, offset: int):
+        magic, count, first, last, topics_nbytes = CHUNK_HEADER.unpack_from(buffer, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"no chunk at offset {offset}")
+        self.offset = offset
+        self.count = count
+        self.first_timestamp = first
+        self.last_timestamp = last
+        offset += CHUNK_HEADER.size
+        self.topics = json.loads(bytes(buffer[offset:offset + topics_nbytes]))
+        offset += _padded(topics_nbytes)
+        self.timestamps = np.frombuffer(buffer, np.float64, count, offset)
+        offset += count * 8
+        self.values = np.frombuffer(buffer, np.float32, count * MAX_VALUES, offset).reshape(count, MAX_VALUES)
+        offset += count * MAX_VALUES * 4
+        self.topic_ids = np.frombuffer(buffer, np.uint16, count, offset)
+        offset += count * 2
+        self.counts = np.frombuffer(buffer, np.uint8, count, offset)
+        self.nbytes = _chunk_nbytes(count, topics_nbytes)
+
+    def entries(self, start: int, end: int) -> list:
+        # messages [start, end) as (timestamp, topic, values, values) entries,
+        # the same shape MQTTHandler.apply gets from decode_binary
+        timestamps = self.timestamps[start:end].tolist()
+        values = self.values[start:end].tolist()
+        topics = [self.topics[i] for i in self.topic_ids[start:end].tolist()]
+        counts = self.counts[start:end].tolist()
+        batch = []
+        for timestamp, topic, row, k in zip(timestamps, topics, values, counts):
+            row = row[:k] if k else None
+            batch.append((timestamp, topic, row if k else "", row))
+        return batch
+
+class TelemetryRecording:
+    # read-only, memory-mapped view of a recording
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self.buffer, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} is not a telemetry recording")
+
+        offsets = self.read_index()
+        self.chunks = [Chunk(self.buffer, offset) for offset in offsets]
+        self.message_count = sum(chunk.count for chunk in self.chunks)
+
+    def read_index(self) -> list:
+        offsets = []
+        offset = FILE_HEADER.size
+        try:
+            with open(index_path(self.path)) as f:
+                index = json.load(f)
+            if index.get("version") == FILE_VERSION and index.get("size", 0) <= len(self.buffer):
+                offsets = [chunk[0] for chunk in index["chunks"]]
+                offset = index["size"]
+        except (OSError, ValueError, KeyError):
+            pass
+        # chunks written after the index (or all of them without one)
+        while offset + CHUNK_HEADER.size <= len(self.buffer):
+            try:
+                chunk = Chunk(self.buffer, offset)
+            except (ValueError, struct.error):
+                break
+            if offset + chunk.nbytes > len(self.buffer):
+                break
+            offsets.append(offset)
+            offset += chunk.nbytes
+        return offsets
+
+    @property
+    def first_timestamp(self) -> float:
+        return self.chunks[0].first_timestamp if self.chunks else 0.0
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.chunks[-1].last_timestamp if self.chunks else 0.0
+
+    def topic_values(self, topic: str) -> tuple:
+        # (timestamps, values) of one topic over the whole recording, for analysis
+        timestamps = []
+        values = []
+        for chunk in self.chunks:
+            if topic not in chunk.topics:
+                continue
+            mask = chunk.topic_ids == chunk.topics.index(topic)
+            timestamps.append(chunk.timestamps[mask])
+            values.append(chunk.values[mask])
+        if not timestamps:
+            return np.zeros(0), np.zeros((0, MAX_VALUES), dtype=np.float32)
+        return np.concatenate(timestamps), np.concatenate(values)
+
+    def close(self) -> None:
+        self.chunks = []
+        self.buffer.close()
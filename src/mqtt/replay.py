@@ -0,0 +1,66 @@
+# replay.py
+
+import time
+import numpy as np
+import wx
+from mqtt.recording import TelemetryRecording
+
+class TelemetryReplay:
+    # feeds a recording into apply (MQTTHandler.apply) from a gui timer, as
+    # if the messages came from the broker. speed 0 replays as fast as the
+    # gui can take it, max_batch messages per tick
+    def __init__(self, recording: TelemetryRecording, apply, speed: float = 1.0, interval_ms: int = 16, max_batch: int = 5000):
+        self.recording = recording
+        self.apply = apply
+        self.speed = speed
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self.on_finished = None
+
+        # read position: chunk index and row inside it
+        self.chunk_index = 0
+        self.row = 0
+        self.replayed = 0
+
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+
+    def start(self) -> None:
+        self.wall_start = time.perf_counter()
+        self.timer.Start(self.interval_ms)
+
+    def stop(self) -> None:
+        self.timer.Stop()
+
+    @property
+    def finished(self) -> bool:
+        return self.chunk_index >= len(self.recording.chunks)
+
+    def take(self, until: float, limit: int) -> list:
+        # every message with a timestamp <= until, at most limit of them
+        batch = []
+        while not self.finished and len(batch) < limit:
+            chunk = self.recording.chunks[self.chunk_index]
+            end = int(np.searchsorted(chunk.timestamps, until, side="right"))
+            end = min(max(end, self.row), self.row + limit - len(batch))
+            batch.extend(chunk.entries(self.row, end))
+            self.row = end
+            if self.row < chunk.count:
+                break
+            self.chunk_index += 1
+            self.row = 0
+        return batch
+
+    def OnTimer(self, event: wx.TimerEvent):
+        if self.speed > 0:
+            elapsed = (time.perf_counter() - self.wall_start) * self.speed
+            batch = self.take(self.recording.first_timestamp + elapsed, self.max_batch)
+        else:
+            batch = self.take(float("inf"), self.max_batch)
+        if batch:
+            self.replayed += len(batch)
+            self.apply(batch)
+        if self.finished:
+            self.stop()
+            if self.on_finished is not None:
+                self.on_finished()
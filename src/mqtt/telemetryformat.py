@@ -0,0 +1,102 @@
+# telemetryformat.py
+
+import time
+import struct
+import numpy as np
+
+# packed little-endian binary payloads, one fixed-size record per message.
+# the first byte is the format version, text payloads start with a printable
+# character so the two can't be confused
+
+FORMAT_VERSION = 1
+
+HEADER_FIELDS = [
+    ("version", "u1"),
+    ("kind", "u1"),
+    ("reserved", "<u2"),
+    ("sequence", "<u4"),
+    ("timestamp", "<f8"), # send time, seconds since the epoch
+]
+
+KIND_POSITION = 1
+KIND_ARM = 2
+KIND_IMU = 3
+
+POSITION_DTYPE = np.dtype(HEADER_FIELDS + [("position", "<f4", 3)])
+ARM_DTYPE = np.dtype(HEADER_FIELDS + [("joint_angles", "<f4", 3)])
+IMU_DTYPE = np.dtype(HEADER_FIELDS + [("acceleration", "<f4", 3), ("angular_velocity", "<f4", 3)])
+
+# topic -> (kind, dtype, value fields in order)
+TOPIC_FORMATS = {
+    "rocky/position": (KIND_POSITION, POSITION_DTYPE, ("position",)),
+    "rocky/arm/1": (KIND_ARM, ARM_DTYPE, ("joint_angles",)),
+    "rocky/arm/2": (KIND_ARM, ARM_DTYPE, ("joint_angles",)),
+    "rocky/imu": (KIND_IMU, IMU_DTYPE, ("acceleration", "angular_velocity")),
+}
+
+def is_binary(payload: bytes) -> bool:
+    return len(payload) > 0 and payload[0] == FORMAT_VERSION
+
+def encode(topic: str, values, sequence: int, timestamp: float) -> bytes:
+    kind, dtype, fields = TOPIC_FORMATS[topic]
+    header = struct.pack("<BBHId", FORMAT_VERSION, kind, 0, sequence & 0xFFFFFFFF, timestamp)
+    return header + np.asarray(values, dtype="<f4").tobytes()
+
+def decode_batch(topic: str, payloads: list):
+    # every payload of one topic in a single np.frombuffer. returns
+    # (records, valid) where valid marks which payloads were decoded;
+    # wrong size, version or kind are skipped
+    kind, dtype, fields = TOPIC_FORMATS[topic]
+    valid = np.array([len(payload) == dtype.itemsize and payload[0] == FORMAT_VERSION and payload[1] == kind
+                      for payload in payloads], dtype=bool)
+    if valid.all():
+        data = b"".join(payloads)
+    else:
+        data = b"".join(payload for payload, ok in zip(payloads, valid) if ok)
+    return np.frombuffer(data, dtype=dtype), valid
+
+def record_values(topic: str, records: np.ndarray) -> np.ndarray:
+    # the numeric fields of a record array as one (n, k) float32 array,
+    # in the same order the text format uses
+    kind, dtype, fields = TOPIC_FORMATS[topic]
+    return np.hstack([records[field] for field in fields])
+
+# ------------------------------------------------------------
+# mqtt messages
+# ------------------------------------------------------------
+
+def parse_message(topic:str, payload:bytes):
+    # runs on the network thread: (timestamp, topic, text, values), values is
+    # None when the payload isn't a list of numbers. binary payloads are kept
+    # as bytes in place of the text and decoded later, in batches, by decode_binary
+    timestamp = time.time()
+    if topic in TOPIC_FORMATS and is_binary(payload):
+        return timestamp, topic, bytes(payload), None
+    text = payload.decode("utf-8", errors="replace")
+    try:
+        values = tuple(float(value) for value in text.split())
+    except ValueError:
+        values = None
+    return timestamp, topic, text, values
+
+def decode_binary(batch:list) -> list:
+    # one np.frombuffer per topic for all binary payloads of a batch, their
+    # entries are replaced by (timestamp, topic, values, values) like text
+    # ones. the log formats the values only for the rows it shows
+    rows = {}
+    for i, (timestamp, topic, payload, values) in enumerate(batch):
+        if isinstance(payload, bytes):
+            rows.setdefault(topic, []).append(i)
+    if not rows:
+        return batch
+    batch = list(batch)
+    for topic, indices in rows.items():
+        records, valid = decode_batch(topic, [batch[i][2] for i in indices])
+        decoded = record_values(topic, records).tolist()
+        if not valid.all():
+            for i in np.asarray(indices)[~valid]:
+                batch[i] = (batch[i][0], topic, "invalid binary payload", None)
+            indices = np.asarray(indices)[valid].tolist()
+        for i, values in zip(indices, decoded):
+            batch[i] = (batch[i][0], topic, values, values)
+    return batch
@@ -0,0 +1,36 @@
+# telemetryqueue.py
+
+import collections
+
+class TelemetryQueue:
+    # single producer (the paho network thread), single consumer (the gui).
+    # deque append and popleft are atomic in cpython so neither side locks.
+    # if the gui falls behind, the oldest messages are dropped
+    def __init__(self, capacity:int=10000):
+        self.messages = collections.deque(maxlen=capacity)
+        # each counter is only written by one side
+        self.pushed = 0
+        self.popped = 0
+
+    def push(self, message) -> None:
+        # producer only
+        self.messages.append(message)
+        self.pushed += 1
+
+    def pop_all(self) -> list:
+        # consumer only, everything queued so far in arrival order
+        batch = []
+        try:
+            while True:
+                batch.append(self.messages.popleft())
+        except IndexError:
+            pass
+        self.popped += len(batch)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    @property
+    def dropped(self) -> int:
+        return max(self.pushed - self.popped - len(self.messages), 0)
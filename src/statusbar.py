@@ -6,8 +6,8 @@ class CustomStatusBar(wx.StatusBar):
     def __init__(self, parent):
         super().__init__(parent)
 
-        self.SetFieldsCount(3)
-        self.SetStatusWidths([-6, -1, -2])
+        self.SetFieldsCount(4)
+        self.SetStatusWidths([-4, -3, -1, -2])
 
         self.SetStatusText("Welcome to RE v1.0", 0)
         self.st_status = wx.StaticText(self, label="")
@@ -22,10 +22,10 @@ class CustomStatusBar(wx.StatusBar):
         event.Skip()
 
     def Reposition(self):
-        rect = self.GetFieldRect(1)
+        rect = self.GetFieldRect(2)
         rect = wx.Rect(rect.x+10, rect.y, rect.width-11, rect.height)
         self.st_status.SetRect(rect)
-        rect = self.GetFieldRect(2)
+        rect = self.GetFieldRect(3)
         rect = wx.Rect(rect.x+10, rect.y, rect.width-11, rect.height)
         self.st_address.SetRect(rect)
 
@@ -38,4 +38,8 @@ class CustomStatusBar(wx.StatusBar):
             self.st_status.SetForegroundColour(wx.RED)
 
     def SetSTAddress(self, value:str):
-        self.st_address.SetLabel(value)
\ No newline at end of file
+        self.st_address.SetLabel(value)
+
+    def SetSTRender(self, value:str):
+        # render profiler summary, empty when the profiler is off
+        self.SetStatusText(value, 1)
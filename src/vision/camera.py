@@ -2,8 +2,11 @@
 
 import wx
 import cv2
+import time
 import numpy as np
 from utils import dip
+from vision.capture import CaptureThread
+from digital_twin.renderscheduler import RenderScheduler
 import math
 
 class PanelCamera(wx.Panel):
@@ -12,19 +15,39 @@ class PanelCamera(wx.Panel):
         self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
         self.capture = capture
         self.current_frame = None
-        self.timer = wx.Timer(self)
+        # capture time (time.time) of the frame on screen
+        self.frame_timestamp = 0.0
+        # the scaled bitmap is only rebuilt for a new frame or panel size
+        self.bitmap = None
+        self.bitmap_key = None
+        self.frame_sequence = 0
         self.Bind(wx.EVT_PAINT, self.OnPaint)
         self.Bind(wx.EVT_SIZE, self.OnSize)
-        self.Bind(wx.EVT_TIMER, self.OnTimer, self.timer)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
+        # fps caps the repaints, frames are read on the capture thread and
+        # only the newest one is shown
         self.fps = fps
-        self.timer.Start(int(1000.0 / self.fps))
+        self.render_scheduler = RenderScheduler(self, fps)
+        self.capture_thread = CaptureThread(capture, self.render_scheduler.request_threadsafe)
+        self.capture_thread.start()
         self.panel_size = self.GetSize()
         #self.model = YOLO("yolo11n.pt", verbose=False)
 
     def OnSize(self, event):
         self.panel_size = self.GetSize()
+        self.Refresh()
+
+    def OnDestroy(self, event):
+        if event.GetEventObject() is self:
+            self.capture_thread.stop()
+            self.render_scheduler.stop()
+        event.Skip()
 
     def OnPaint(self, event):
+        latest = self.capture_thread.take()
+        if latest is not None:
+            self.frame_sequence, self.frame_timestamp, frame = latest
+            self.current_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         dc = wx.AutoBufferedPaintDC(self)
         dc.Clear()
         #dc.SetBrush(wx.BLACK_BRUSH)
@@ -45,29 +68,32 @@ class PanelCamera(wx.Panel):
                 new_width = int(panel_height * frame_aspect)
                 start_x = (panel_width - new_width) // 2
                 start_y = 0
-                
-            resized_frame = cv2.resize(self.current_frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
-            # resized_frame = cv2.flip(resized_frame, 0)
 
-            # results = self.model(resized_frame, stream=True, verbose=False)
-            # img = resized_frame
-            # for r in results:
-            #     boxes = r.boxes
-            #     for box in boxes:
-            #         x1, y1, x2, y2 = box.xyxy[0]
-            #         x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-            # cv2.rectangle(img, (x1, y1), (x2, y2), (255, 0, 0), 3)
-            # confidence = math.ceil((box.conf[0]*100))/100
-            # cls = self.model.names[int(box.cls[0])]
-            # cv2.putText(img, cls, [x1, y1], cv2.FONT_HERSHEY_SIMPLEX,
-            #             1, (255, 0, 255), 2)
-            # resized_frame = img
-            
-            bmp = wx.Bitmap.FromBuffer(new_width, new_height, resized_frame)
-            dc.DrawBitmap(bmp, start_x, start_y)
+            key = (self.frame_sequence, new_width, new_height)
+            if key != self.bitmap_key:
+                resized_frame = cv2.resize(self.current_frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+                # resized_frame = cv2.flip(resized_frame, 0)
+
+                # results = self.model(resized_frame, stream=True, verbose=False)
+                # img = resized_frame
+                # for r in results:
+                #     boxes = r.boxes
+                #     for box in boxes:
+                #         x1, y1, x2, y2 = box.xyxy[0]
+                #         x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                # cv2.rectangle(img, (x1, y1), (x2, y2), (255, 0, 0), 3)
+                # confidence = math.ceil((box.conf[0]*100))/100
+                # cls = self.model.names[int(box.cls[0])]
+                # cv2.putText(img, cls, [x1, y1], cv2.FONT_HERSHEY_SIMPLEX,
+                #             1, (255, 0, 255), 2)
+                # resized_frame = img
+
+                self.bitmap = wx.Bitmap.FromBuffer(new_width, new_height, resized_frame)
+                self.bitmap_key = key
+            dc.DrawBitmap(self.bitmap, start_x, start_y)
+        self.render_scheduler.frame_rendered()
+
+    def latency(self) -> float:
+        # seconds from capture to now of the frame on screen
+        return time.time() - self.frame_timestamp if self.frame_timestamp else 0.0
 
-    def OnTimer(self, event):
-        ret, frame = self.capture.read()
-        if ret:
-            self.current_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.Refresh()
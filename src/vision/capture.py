@@ -0,0 +1,79 @@
+# capture.py
+
+import time
+import threading
+
+class CaptureThread:
+    # reads and decodes frames from a cv2.VideoCapture (or anything with
+    # read() -> (ok, frame)) on its own thread, so a slow stream never blocks
+    # the gui. there is a single slot with the newest frame: a frame that
+    # was not taken before the next one arrived is dropped.
+    # on_frame is called from the capture thread after every new frame
+    def __init__(self, capture, on_frame=None, retry_delay: float = 0.1):
+        self.capture = capture
+        self.on_frame = on_frame
+        self.retry_delay = retry_delay
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+        self.frame = None
+        self.timestamp = 0.0
+        # sequence of the newest frame, and of the last one taken
+        self.sequence = 0
+        self.taken = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.failed = 0
+        self.start_time = 0.0
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="capture", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        # a read in progress can't be interrupted, don't wait for it forever
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def run(self) -> None:
+        while self.running:
+            ok, frame = self.capture.read()
+            timestamp = time.time()
+            if not ok:
+                self.failed += 1
+                time.sleep(self.retry_delay)
+                continue
+            with self.lock:
+                if self.sequence != self.taken:
+                    self.dropped += 1
+                self.frame = frame
+                self.timestamp = timestamp
+                self.sequence += 1
+                self.decoded += 1
+            if self.on_frame is not None:
+                self.on_frame()
+
+    def take(self):
+        # (sequence, timestamp, frame) of the newest frame if it wasn't taken
+        # yet, otherwise None. any thread
+        with self.lock:
+            if self.sequence == self.taken:
+                return None
+            self.taken = self.sequence
+            return self.sequence, self.timestamp, self.frame
+
+    def stats(self) -> dict:
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9) if self.start_time else 0.0
+        return {
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "decode_fps": self.decoded / elapsed if elapsed else 0.0,
+        }
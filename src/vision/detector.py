@@ -0,0 +1,221 @@
+# detector.py
+
+import numpy as np
+
+# COCO, the classes yolo11n.onnx was trained on
+CLASS_NAMES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck",
+    "boat", "traffic light", "fire hydrant", "stop sign", "parking meter", "bench",
+    "bird", "cat", "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra",
+    "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee",
+    "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove",
+    "skateboard", "surfboard", "tennis racket", "bottle", "wine glass", "cup",
+    "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange",
+    "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch",
+    "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse",
+    "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink",
+    "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier",
+    "toothbrush"
+]
+
+CONF_THRESHOLD = 0.25
+NMS_THRESHOLD = 0.45
+# candidates kept for nms and detections kept after it, bounds the worst case
+MAX_CANDIDATES = 3000
+MAX_DETECTIONS = 300
+
+# input size, must match the imgsz used during the onnx export
+INPUT_WIDTH = 640
+INPUT_HEIGHT = 640
+# gray of the letterbox bars, as in the ultralytics training pipeline
+PAD_VALUE = 114
+
+# one session per (model, providers), shared by every Detector
+_sessions = {}
+
+def get_session(model_path: str, providers=None):
+    import onnxruntime as ort
+
+    providers = tuple(providers or ("CUDAExecutionProvider", "CPUExecutionProvider"))
+    key = (model_path, providers)
+    session = _sessions.get(key)
+    if session is None:
+        try:
+            session = ort.InferenceSession(model_path, providers=list(providers))
+        except Exception as e:
+            print(f"Error initializing ONNX Runtime session with {providers}: {e}. Falling back to CPU only.")
+            session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        _sessions[key] = session
+    return session
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float, class_ids: np.ndarray = None) -> np.ndarray:
+    # greedy non-maximum suppression of (n, 4) x1 y1 x2 y2 boxes, returns the
+    # kept indices by descending score. with class_ids, boxes of different
+    # classes never suppress each other (they are moved apart first)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if class_ids is not None:
+        boxes = boxes + (class_ids * (boxes.max() - boxes.min() + 1.0))[:, None].astype(boxes.dtype)
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+class Detections:
+    # boxes are (n, 4) x y width height in frame pixels
+    def __init__(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray):
+        self.boxes = boxes
+        self.scores = scores
+        self.class_ids = class_ids
+
+    def __len__(self):
+        return len(self.scores)
+
+    def to_list(self, class_names: list = CLASS_NAMES) -> list:
+        # same records test_inference.py prints
+        detections = []
+        for (x, y, w, h), score, class_id in zip(np.rint(self.boxes).astype(int).tolist(), self.scores.tolist(), self.class_ids.tolist()):
+            detections.append({
+                "class_name": str(class_names[class_id]),
+                "confidence": round(score, 4),
+                "bounding_box": {"x": x, "y": y, "width": w, "height": h}
+            })
+        return detections
+
+def postprocess(predictions: np.ndarray, num_classes: int, x_factor: float, y_factor: float,
+                conf_threshold: float = CONF_THRESHOLD, nms_threshold: float = NMS_THRESHOLD,
+                x_offset: float = 0.0, y_offset: float = 0.0) -> Detections:
+    # raw yolo output, (1, 4 + classes, anchors) or (1, anchors, 4 + classes),
+    # to detections in frame pixels: frame = (model - offset) * factor
+    predictions = predictions[0]
+    if predictions.shape[0] != num_classes + 4:
+        predictions = predictions.T
+    # (4 + classes, anchors), rows are contiguous so no transposed copy.
+    # max over the rows is much cheaper than argmax, the class is only
+    # looked up for the anchors above the threshold
+    scores = predictions[4:].max(axis=0)
+    candidates = np.flatnonzero(scores > conf_threshold)
+    if len(candidates) > MAX_CANDIDATES:
+        candidates = candidates[np.argpartition(-scores[candidates], MAX_CANDIDATES)[:MAX_CANDIDATES]]
+    scores = scores[candidates]
+    class_ids = np.argmax(predictions[4:, candidates], axis=0)
+
+    cx, cy, w, h = predictions[:4, candidates]
+    boxes = np.empty((len(candidates), 4), dtype=np.float32)
+    boxes[:, 0] = (cx - w / 2 - x_offset) * x_factor
+    boxes[:, 1] = (cy - h / 2 - y_offset) * y_factor
+    boxes[:, 2] = w * x_factor
+    boxes[:, 3] = h * y_factor
+
+    corners = boxes.copy()
+    corners[:, 2:] += corners[:, :2]
+    keep = nms(corners, scores, nms_threshold, class_ids)[:MAX_DETECTIONS]
+    return Detections(boxes[keep], scores[keep], class_ids[keep])
+
+class Preprocessor:
+    # bgr frames to the (1, 3, height, width) float32 rgb network input, in
+    # place: the frame is letterboxed (scaled to fit, centered, padded) into
+    # one input tensor that is reused by every frame. buffers are only
+    # reallocated, and the padding only written, when the frame size changes
+    def __init__(self, width: int = INPUT_WIDTH, height: int = INPUT_HEIGHT):
+        self.width = width
+        self.height = height
+        self.input_tensor = np.empty((1, 3, height, width), dtype=np.float32)
+        self.frame_size = None
+        self.resized = None
+        self.region = None
+        # frame = (input - offset) * factor
+        self.x_factor = self.y_factor = 1.0
+        self.x_offset = self.y_offset = 0
+
+    def set_frame_size(self, width: int, height: int) -> None:
+        scale = min(self.width / width, self.height / height)
+        resized_width = max(1, min(self.width, round(width * scale)))
+        resized_height = max(1, min(self.height, round(height * scale)))
+        self.x_offset = (self.width - resized_width) // 2
+        self.y_offset = (self.height - resized_height) // 2
+        self.x_factor = width / resized_width
+        self.y_factor = height / resized_height
+
+        self.input_tensor.fill(PAD_VALUE / 255.0)
+        self.region = self.input_tensor[0, :, self.y_offset:self.y_offset + resized_height, self.x_offset:self.x_offset + resized_width]
+        self.resized = np.empty((resized_height, resized_width, 3), dtype=np.uint8)
+        self.frame_size = (width, height)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        import cv2
+
+        height, width = frame.shape[:2]
+        if (width, height) != self.frame_size:
+            self.set_frame_size(width, height)
+        source = frame
+        if self.resized.shape[:2] != (height, width):
+            source = cv2.resize(frame, self.resized.shape[1::-1], dst=self.resized, interpolation=cv2.INTER_LINEAR)
+        # bgr hwc uint8 -> rgb chw float in [0, 1], one plane at a time
+        # straight into the tensor, numpy casts through a small buffer
+        for channel in range(3):
+            np.multiply(source[:, :, 2 - channel], np.float32(1.0 / 255.0), out=self.region[channel], dtype=np.float32)
+        return self.input_tensor
+
+class Detector:
+    # yolo object detection with onnx runtime. the session, its input and
+    # output names and the input size are looked up once. with io_binding
+    # the session reads the preprocessor's input tensor in place instead of
+    # copying it on every run
+    def __init__(self, model_path: str = "yolo11n.onnx", class_names: list = CLASS_NAMES,
+                 conf_threshold: float = CONF_THRESHOLD, nms_threshold: float = NMS_THRESHOLD, providers=None,
+                 io_binding: bool = False):
+        self.class_names = class_names
+        self.conf_threshold = conf_threshold
+        self.nms_threshold = nms_threshold
+        self.session = get_session(model_path, providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_names = [output.name for output in self.session.get_outputs()]
+        # dynamic axes come back as strings
+        height, width = model_input.shape[2:4]
+        self.input_height = height if isinstance(height, int) else INPUT_HEIGHT
+        self.input_width = width if isinstance(width, int) else INPUT_WIDTH
+        self.preprocessor = Preprocessor(self.input_width, self.input_height)
+
+        self.binding = None
+        if io_binding:
+            try:
+                self.binding = self.session.io_binding()
+                # the buffer never changes, binding it once is enough
+                self.binding.bind_cpu_input(self.input_name, self.preprocessor.input_tensor)
+                for name in self.output_names:
+                    self.binding.bind_output(name)
+            except Exception as e:
+                print(f"Error binding ONNX Runtime inputs: {e}. Using session.run.")
+                self.binding = None
+
+    def preprocess(self, frame: np.ndarray) -> np.ndarray:
+        # letterboxed input tensor for a bgr frame, owned by the preprocessor
+        return self.preprocessor(frame)
+
+    def infer(self, input_tensor: np.ndarray) -> list:
+        if self.binding is not None and input_tensor is self.preprocessor.input_tensor:
+            self.session.run_with_iobinding(self.binding)
+            return self.binding.copy_outputs_to_cpu()
+        return self.session.run(self.output_names, {self.input_name: input_tensor})
+
+    def postprocess(self, outputs: list) -> Detections:
+        # boxes of the last preprocessed frame, mapped back through its letterbox
+        p = self.preprocessor
+        return postprocess(outputs[0], len(self.class_names), p.x_factor, p.y_factor,
+                           self.conf_threshold, self.nms_threshold, p.x_offset, p.y_offset)
+
+    def detect(self, frame: np.ndarray) -> Detections:
+        return self.postprocess(self.infer(self.preprocess(frame)))
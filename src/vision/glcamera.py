@@ -0,0 +1,182 @@
+# glcamera.py
+
+import wx
+import time
+import ctypes
+import wx.glcanvas as glcanvas
+import numpy as np
+from OpenGL.GL import *
+from vision.capture import CaptureThread
+from digital_twin.renderscheduler import RenderScheduler
+from digital_twin.shaderprogram import ShaderProgram
+
+# quad from gl_VertexID, no vertex buffer. scale letterboxes it
+SOURCE_CAMERA_VERTEX = """
+#version 330 core
+uniform vec2 scale;
+
+out vec2 uv;
+
+void main() {
+  vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+  // image rows are stored top first
+  uv = vec2(corner.x, 1.0 - corner.y);
+  gl_Position = vec4((corner * 2.0 - 1.0) * scale, 0.0, 1.0);
+}
+"""
+
+# the channel order is fixed by the texture swizzle
+SOURCE_CAMERA_FRAGMENT = """
+#version 330 core
+uniform sampler2D frame;
+
+in vec2 uv;
+out vec4 frag_color;
+
+void main() {
+  frag_color = vec4(texture(frame, uv).rgb, 1.0);
+}
+"""
+
+# upload format and swizzle by channel count, frames come from cv2 (bgr)
+FRAME_FORMATS = {
+    1: (GL_RED, GL_R8, (GL_RED, GL_RED, GL_RED, GL_ONE)),
+    3: (GL_RGB, GL_RGB8, (GL_BLUE, GL_GREEN, GL_RED, GL_ONE)),
+    4: (GL_RGBA, GL_RGBA8, (GL_BLUE, GL_GREEN, GL_RED, GL_ONE)),
+}
+
+class PanelCameraGL(glcanvas.GLCanvas):
+    # same as PanelCamera, drawn with opengl: every new frame is uploaded
+    # once through a pixel buffer into a texture, scaling, letterboxing and
+    # the bgr -> rgb swap happen on the gpu. paints without a new frame only
+    # redraw the quad
+    def __init__(self, parent, capture, fps=200):
+
+        dispAttrs = glcanvas.GLAttributes()
+        dispAttrs.PlatformDefaults().DoubleBuffer().EndList()
+
+        super().__init__(parent, dispAttrs, size=wx.Size(300, 300))
+
+        self.context = None
+        self.init = False
+        self.capture = capture
+        # (height, width, channels) of the texture
+        self.frame_shape = None
+        # capture time (time.time) of the frame on screen
+        self.frame_timestamp = 0.0
+        self.uploaded = 0
+        self.background = (0.0, 0.0, 0.0)
+
+        self.Bind(wx.EVT_ERASE_BACKGROUND, self.OnEraseBackground)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
+
+        self.fps = fps
+        self.render_scheduler = RenderScheduler(self, fps)
+        self.capture_thread = CaptureThread(capture, self.render_scheduler.request_threadsafe)
+        self.capture_thread.start()
+
+    def InitGL(self):
+        if self.context is None:
+            self.context = glcanvas.GLContext(self)
+        self.SetCurrent(self.context)
+        if not self.init:
+            self.shader_program = ShaderProgram(SOURCE_CAMERA_VERTEX, SOURCE_CAMERA_FRAGMENT)
+            # core profile needs a vao bound even without attributes
+            self.vao = glGenVertexArrays(1)
+            self.pbo = glGenBuffers(1)
+            self.texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+            glBindTexture(GL_TEXTURE_2D, 0)
+            self.init = True
+
+    def OnEraseBackground(self, event):
+        pass
+
+    def OnDestroy(self, event):
+        if event.GetEventObject() is self:
+            self.capture_thread.stop()
+            self.render_scheduler.stop()
+            if self.init:
+                self.SetCurrent(self.context)
+                self.shader_program.delete()
+                glDeleteTextures(1, [self.texture])
+                glDeleteBuffers(1, [self.pbo])
+                glDeleteVertexArrays(1, [self.vao])
+                self.init = False
+        event.Skip()
+
+    def OnSize(self, event):
+        self.Refresh(False)
+        event.Skip()
+
+    def upload(self, frame: np.ndarray) -> None:
+        frame = np.ascontiguousarray(frame)
+        shape = frame.shape if frame.ndim == 3 else frame.shape + (1,)
+        pixel_format, internal_format, swizzle = FRAME_FORMATS[shape[2]]
+        height, width = shape[:2]
+
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        if shape != self.frame_shape:
+            # storage only changes with the stream resolution
+            glTexImage2D(GL_TEXTURE_2D, 0, internal_format, width, height, 0, pixel_format, GL_UNSIGNED_BYTE, None)
+            glTexParameteriv(GL_TEXTURE_2D, GL_TEXTURE_SWIZZLE_RGBA, np.array(swizzle, dtype=np.int32))
+            self.frame_shape = shape
+
+        # orphan the pixel buffer so the copy never waits for the previous
+        # upload, then let the texture update read from it asynchronously
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbo)
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, frame.nbytes, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_PIXEL_UNPACK_BUFFER, 0, frame.nbytes, frame)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, pixel_format, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.uploaded += 1
+
+    def letterbox_scale(self, width: int, height: int) -> tuple:
+        # quad size in ndc that keeps the frame aspect inside the canvas
+        frame_height, frame_width = self.frame_shape[:2]
+        frame_aspect = frame_width / float(frame_height)
+        panel_aspect = width / float(max(height, 1))
+        if frame_aspect > panel_aspect:
+            return 1.0, panel_aspect / frame_aspect
+        return frame_aspect / panel_aspect, 1.0
+
+    def OnPaint(self, event):
+
+        self.InitGL()
+
+        latest = self.capture_thread.take()
+        if latest is not None:
+            sequence, self.frame_timestamp, frame = latest
+            self.upload(frame)
+
+        size = self.GetClientSize()
+        glViewport(0, 0, size.width, size.height)
+        glClearColor(*self.background, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        if self.frame_shape is not None:
+            self.shader_program.use()
+            self.shader_program.set_vec2("scale", self.letterbox_scale(size.width, size.height))
+            self.shader_program.set_int("frame", 0)
+            glActiveTexture(GL_TEXTURE0)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glBindVertexArray(self.vao)
+            glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+            glBindVertexArray(0)
+            glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.SwapBuffers()
+        self.render_scheduler.frame_rendered()
+        event.Skip()
+
+    def latency(self) -> float:
+        # seconds from capture to now of the frame on screen
+        return time.time() - self.frame_timestamp if self.frame_timestamp else 0.0